@@ -0,0 +1,107 @@
+"""Benchmark the single-pass response compactor against the previous recursive limit_response_size.
+
+Usage:
+    python benchmarks/bench_compactor.py [--payload-dir DIR] [--budget 6000] [--repeat 20]
+
+Without --payload-dir, synthetic LinkedIn-like payloads of increasing size are
+generated. Point --payload-dir at a folder of captured upstream responses
+(*.json) to benchmark real data.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+from pathlib import Path
+
+os.environ.setdefault("RAPIDAPI_KEY", "benchmark")
+os.environ.setdefault("SERPER_API_KEY", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+
+
+def legacy_limit_response_size(data: dict, max_chars: int = 8000) -> dict:
+    """The recursive, repr-measuring implementation replaced by the compactor."""
+    if not data:
+        return data
+    filtered_data = {}
+    current_size = 0
+    for key, value in data.items():
+        if any(skip_key in key.lower() for skip_key in ['image', 'photo', 'avatar', 'picture', 'media', 'url']):
+            continue
+        if isinstance(value, str) and len(value) > 500:
+            value = value[:500] + "..."
+        elif isinstance(value, list) and len(value) > 10:
+            value = value[:10]
+        elif isinstance(value, dict):
+            value = legacy_limit_response_size(value, max_chars // 4)
+        value_str = str(value)
+        if current_size + len(value_str) > max_chars:
+            break
+        filtered_data[key] = value
+        current_size += len(value_str)
+    return filtered_data
+
+
+def synthetic_payload(posts: int, seed: int = 0) -> dict:
+    """A post-list payload (as returned by /company/posts) with nested authors, media, comments and long text."""
+    rng = random.Random(seed)
+
+    def text(n: int) -> str:
+        return " ".join(rng.choice(["growth", "AI", "launch", "team", "hiring", "results", "platform"]) for _ in range(n))
+
+    def author() -> dict:
+        return {"name": text(2), "headline": text(20), "profile_picture": "https://media.example.com/p.jpg"}
+
+    return {
+        "success": True,
+        "company": {
+            "name": "Example Corp",
+            "description": text(60),
+            "logo_url": "https://media.example.com/logo.png",
+            "locations": [{"city": text(1), "country": "US"} for _ in range(30)],
+        },
+        "posts": [
+            {
+                "text": text(rng.randint(50, 400)),
+                "likes": rng.randint(0, 5000),
+                "reposts": rng.randint(0, 200),
+                "posted_at": "2025-01-01T00:00:00Z",
+                "author": author(),
+                "media": [{"url": "https://media.example.com/i.jpg", "width": 800, "height": 600}],
+                "reactions": {kind: rng.randint(0, 1000) for kind in ("like", "celebrate", "support", "love", "insightful", "funny")},
+                "comments": [{"text": text(rng.randint(5, 60)), "author": author()} for _ in range(posts // 10)],
+            }
+            for _ in range(posts)
+        ],
+        "meta": {"request_id": "bench", "elapsed_ms": 1234},
+    }
+
+
+def load_payloads(payload_dir: str | None) -> list[tuple[str, dict]]:
+    if payload_dir:
+        return [(path.name, json.loads(path.read_text())) for path in sorted(Path(payload_dir).glob("*.json"))]
+    return [(f"synthetic-{n}-posts", synthetic_payload(n, seed=n)) for n in (10, 100, 300, 1000)]
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payload-dir", help="directory of captured upstream JSON responses")
+    parser.add_argument("--budget", type=int, default=main.RESPONSE_LIMITS["linkedin_profile"])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'payload':<24}{'input KB':>10}{'legacy ms':>12}{'compact ms':>12}{'speedup':>9}{'legacy out B':>14}{'compact out B':>15}")
+    for name, payload in load_payloads(args.payload_dir):
+        input_kb = len(json.dumps(payload)) / 1024
+        legacy = timeit.timeit(lambda: legacy_limit_response_size(payload, args.budget), number=args.repeat) / args.repeat
+        compact = timeit.timeit(lambda: main.limit_response_size(payload, args.budget), number=args.repeat) / args.repeat
+        legacy_out = len(json.dumps(legacy_limit_response_size(payload, args.budget), separators=(",", ":")))
+        compact_out = len(json.dumps(main.limit_response_size(payload, args.budget), separators=(",", ":")))
+        print(f"{name:<24}{input_kb:>10.1f}{legacy * 1000:>12.3f}{compact * 1000:>12.3f}{legacy / compact:>8.1f}x{legacy_out:>14}{compact_out:>15}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,120 @@
+"""Micro-benchmark JSON decode and encode paths for the existing extractors.
+
+Usage:
+    python benchmarks/bench_serializer.py [--repeat 200]
+
+For every extractor tool path it times the previous output path
+(json.dumps(..., indent=2)) against compact stdlib output and, when
+installed, orjson and msgspec, and reports the emitted size. It also
+compares decoding a raw upstream body via text + json.loads with decoding
+the bytes directly.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import random
+import sys
+import timeit
+from pathlib import Path
+
+os.environ.setdefault("RAPIDAPI_KEY", "benchmark")
+os.environ.setdefault("SERPER_API_KEY", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+
+rng = random.Random(42)
+
+
+def text(n: int) -> str:
+    return " ".join(rng.choice(["growth", "AI", "launch", "team", "hiring", "results", "Zürich", "naïve"]) for _ in range(n))
+
+
+def raw_payloads() -> dict[str, dict]:
+    return {
+        "linkedin_profile": {
+            "name": text(2), "headline": text(40), "location": text(2), "connections": 500, "followers": 1234,
+            "experience": [{"title": text(3), "company": text(2), "duration": "2 yrs", "description": text(80)} for _ in range(15)],
+            "education": [{"school": text(3), "degree": text(3)} for _ in range(4)],
+            "skills": [text(2) for _ in range(50)],
+        },
+        "facebook_profile": {
+            "name": text(2), "likes": 98765, "followers": 125432, "about": text(200), "category": text(2),
+            "location": text(2), "page_info": {"checkins": 1243, "rating": 4.8, "review_count": 567},
+        },
+        "instagram_profile": {
+            "username": "bench", "full_name": text(2), "biography": text(60), "followers": 156789, "following": 892,
+            "posts_count": 1247, "is_verified": True, "engagement_rate": 4.2, "avg_likes": 6543,
+        },
+        "linkedin_posts": {
+            "posts": [
+                {"text": text(rng.randint(30, 300)), "likes": rng.randint(0, 5000), "comments": rng.randint(0, 300),
+                 "shares": rng.randint(0, 100), "date": "2025-01-01", "author": {"name": text(2), "title": text(6)}}
+                for _ in range(100)
+            ]
+        },
+    }
+
+
+def tool_outputs() -> dict[str, object]:
+    raw = raw_payloads()
+    return {
+        "get_personal_profile": main.limit_response_size(main.extract_linkedin_profile_essentials(raw["linkedin_profile"]), max_chars=main.RESPONSE_LIMITS["linkedin_profile"]),
+        "get_facebook_profile": main.limit_response_size(main.extract_facebook_profile_essentials(raw["facebook_profile"]), max_chars=main.RESPONSE_LIMITS["facebook_profile"]),
+        "get_instagram_profile": main.limit_response_size(main.extract_instagram_profile_essentials(raw["instagram_profile"]), max_chars=main.RESPONSE_LIMITS["instagram_profile"]),
+        "get_profile_posts": main.limit_response_size(main.extract_posts_essentials(raw["linkedin_posts"], max_posts=main.RESPONSE_LIMITS["max_posts_returned"]), max_chars=main.RESPONSE_LIMITS["linkedin_posts"]),
+        "raw posts (unfiltered)": raw["linkedin_posts"],
+    }
+
+
+def encoders() -> dict[str, object]:
+    found = {
+        "json indent=2 (old)": lambda data: json.dumps(data, indent=2),
+        "json compact": lambda data: json.dumps(data, separators=(",", ":"), ensure_ascii=False),
+    }
+    if importlib.util.find_spec("orjson"):
+        import orjson
+        found["orjson compact"] = lambda data: orjson.dumps(data).decode()
+    if importlib.util.find_spec("msgspec"):
+        import msgspec
+        found["msgspec compact"] = lambda data: msgspec.json.encode(data).decode()
+    return found
+
+
+def decoders() -> dict[str, object]:
+    found = {"text + json.loads (old)": lambda body: json.loads(body.decode("utf-8")), "json.loads(bytes)": json.loads}
+    if importlib.util.find_spec("orjson"):
+        import orjson
+        found["orjson.loads(bytes)"] = orjson.loads
+    if importlib.util.find_spec("msgspec"):
+        import msgspec
+        found["msgspec decode(bytes)"] = msgspec.json.decode
+    return found
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    print(f"configured backend: {main.json_backend}, style: {main.RESPONSE_JSON_STYLE}\n")
+
+    print(f"{'tool output':<26}{'encoder':<24}{'us/op':>10}{'bytes':>10}")
+    for name, data in tool_outputs().items():
+        for encoder_name, encode in encoders().items():
+            seconds = timeit.timeit(lambda: encode(data), number=args.repeat) / args.repeat
+            size = len(encode(data).encode())
+            print(f"{name:<26}{encoder_name:<24}{seconds * 1e6:>10.1f}{size:>10}")
+        print()
+
+    print(f"{'raw upstream body':<26}{'decoder':<24}{'us/op':>10}{'bytes':>10}")
+    for name, data in raw_payloads().items():
+        body = json.dumps(data).encode()
+        for decoder_name, decode in decoders().items():
+            seconds = timeit.timeit(lambda: decode(body), number=args.repeat) / args.repeat
+            print(f"{name:<26}{decoder_name:<24}{seconds * 1e6:>10.1f}{len(body):>10}")
+        print()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,103 @@
+"""Measure stdio cold start: time to the first initialize and tools/list responses, and idle RSS.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 10] [--mode default|fast|both] [--idle-ms 500]
+
+Each run spawns a fresh `python main.py`, exactly as a stdio client does at
+the start of a conversation, speaks raw JSON-RPC to it (initialize, then
+tools/list) and kills it. Timings are measured from spawn. Idle RSS is the
+server's VmRSS after --idle-ms of quiet following the tools/list response
+(Linux only). "fast" sets MCP_FAST_START=true; "default" sets it to false.
+Other server variables are passed through from the environment.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PROTOCOL_VERSION = "2025-06-18"
+
+
+def rss_mb(pid: int) -> float | None:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def request(server: subprocess.Popen, message_id: int, method: str, params: dict | None = None) -> dict:
+    message = {"jsonrpc": "2.0", "id": message_id, "method": method}
+    if params is not None:
+        message["params"] = params
+    server.stdin.write(json.dumps(message) + "\n")
+    server.stdin.flush()
+    while True:
+        line = server.stdout.readline()
+        if not line:
+            raise RuntimeError(f"server exited before answering {method}")
+        reply = json.loads(line)
+        if reply.get("id") == message_id:
+            if "error" in reply:
+                raise RuntimeError(f"{method} failed: {reply['error']}")
+            return reply["result"]
+
+
+def one_run(fast: bool, idle_ms: float) -> dict:
+    env = dict(os.environ, MCP_FAST_START="true" if fast else "false", MCP_TRANSPORT="stdio")
+    env.setdefault("RAPIDAPI_KEY", "benchmark")
+    env.setdefault("SERPER_API_KEY", "benchmark")
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, str(ROOT / "main.py")], cwd=str(ROOT), env=env, text=True,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    try:
+        request(server, 1, "initialize", {
+            "protocolVersion": PROTOCOL_VERSION, "capabilities": {},
+            "clientInfo": {"name": "bench_startup", "version": "1"},
+        })
+        initialized = time.perf_counter() - started
+        server.stdin.write(json.dumps({"jsonrpc": "2.0", "method": "notifications/initialized"}) + "\n")
+        server.stdin.flush()
+        tools = request(server, 2, "tools/list", {})["tools"]
+        listed = time.perf_counter() - started
+        time.sleep(idle_ms / 1000)
+        return {"initialize": initialized, "tools_list": listed, "rss": rss_mb(server.pid), "tools": len(tools)}
+    finally:
+        server.kill()
+        server.wait()
+
+
+def summarize(values: list[float]) -> str:
+    return f"{statistics.median(values) * 1000:>9.1f}{min(values) * 1000:>9.1f}{max(values) * 1000:>9.1f}"
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--mode", choices=("default", "fast", "both"), default="both")
+    parser.add_argument("--idle-ms", type=float, default=500.0)
+    args = parser.parse_args()
+
+    modes = ("default", "fast") if args.mode == "both" else (args.mode,)
+    one_run(fast=False, idle_ms=0)  # warm the bytecode and OS file caches so the first measured run isn't an outlier
+    print(f"{args.runs} runs per mode, times in ms from spawn (median / min / max)\n")
+    print(f"{'mode':<9}{'tools':>6}{'initialize':>27}{'tools/list':>27}{'idle RSS MB':>13}")
+    for mode in modes:
+        results = [one_run(mode == "fast", args.idle_ms) for _ in range(args.runs)]
+        rss = [r["rss"] for r in results if r["rss"] is not None]
+        rss_text = f"{statistics.median(rss):.1f}" if rss else "n/a"
+        print(f"{mode:<9}{results[0]['tools']:>6}{summarize([r['initialize'] for r in results])}"
+              f"{summarize([r['tools_list'] for r in results])}{rss_text:>13}")
+
+
+if __name__ == "__main__":
+    run()
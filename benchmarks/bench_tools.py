@@ -0,0 +1,191 @@
+"""Load-test the MCP tools offline against the local mock upstream.
+
+Usage:
+    python benchmarks/bench_tools.py [--mode direct|stdio|both] [--requests 400] [--concurrency 16]
+        [--distinct 100] [--tools get_personal_profile,search_posts,...]
+        [--latency-ms 50] [--jitter-ms 10] [--error-rate 0] [--payload-scale 1] [--fixtures DIR]
+
+Starts benchmarks/mock_upstream.py in a subprocess and points every
+*_API_BASE at it, so no API credits are spent. "direct" awaits the tool
+functions in-process; "stdio" spawns main.py and calls the tools through an
+MCP client session, as an agent would. Each request picks one of
+--distinct identifiers, which controls the cache hit rate.
+
+Reports throughput, p50/p95/p99 tool latency, failed calls, the peak RSS of
+the process serving the tools (the harness itself in direct mode) and the
+upstream calls the mock received. Rate limits default to 100000/min so the
+limiter does not dominate; set *_RATE_LIMIT or any other server variable in
+the environment to benchmark a specific configuration.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.request import urlopen
+
+ROOT = Path(__file__).resolve().parent.parent
+
+WORKLOAD = {
+    "get_personal_profile": lambda i: {"linkedin_url": f"https://www.linkedin.com/in/user-{i}/"},
+    "get_company_profile": lambda i: {"linkedin_url": f"company-{i}"},
+    "get_profile_posts": lambda i: {"linkedin_url": f"user-{i}"},
+    "get_post_details": lambda i: {"post_url": f"https://www.linkedin.com/posts/{i}"},
+    "get_post_comments": lambda i: {"post_url": f"https://www.linkedin.com/posts/{i}", "max_items": 25},
+    "search_posts": lambda i: {"keyword": f"keyword {i}"},
+    "search_jobs": lambda i: {"keyword": f"engineer {i}"},
+    "get_facebook_profile": lambda i: {"profile_url": f"https://www.facebook.com/page-{i}"},
+    "get_instagram_profile": lambda i: {"instagram_url_or_username": f"user_{i}"},
+    "scrape_website": lambda i: {"query": f"query {i}"},
+}
+
+
+def start_mock(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    command = [
+        sys.executable, str(ROOT / "benchmarks" / "mock_upstream.py"),
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate), "--payload-scale", str(args.payload_scale),
+    ]
+    if args.fixtures:
+        command += ["--fixtures", args.fixtures]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    return process, process.stdout.readline().strip()
+
+
+def mock_stats(base_url: str, reset: bool = False) -> dict:
+    with urlopen(f"{base_url}/__reset" if reset else f"{base_url}/__stats") as response:
+        return json.loads(response.read())
+
+
+def configure_environment(base_url: str) -> None:
+    os.environ.setdefault("RAPIDAPI_KEY", "benchmark")
+    os.environ.setdefault("SERPER_API_KEY", "benchmark")
+    for upstream in ("LINKEDIN", "FACEBOOK", "INSTAGRAM", "SERPER"):
+        os.environ[f"{upstream}_API_BASE"] = f"{base_url}/{upstream.lower()}"
+        os.environ.setdefault(f"{upstream}_RATE_LIMIT", "100000")
+
+
+def build_calls(args: argparse.Namespace) -> list[tuple[str, dict]]:
+    rng = random.Random(args.seed)
+    tools = args.tools.split(",") if args.tools else list(WORKLOAD)
+    return [(tool, WORKLOAD[tool](rng.randrange(args.distinct))) for tool in (tools[n % len(tools)] for n in range(args.requests))]
+
+
+async def drive(calls: list[tuple[str, dict]], concurrency: int, call_tool) -> tuple[list[float], int, float]:
+    """Run calls with at most concurrency in flight; returns latencies, failures and wall time."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one(tool: str, arguments: dict) -> None:
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            ok = await call_tool(tool, arguments)
+            latencies.append(time.perf_counter() - started)
+            failures += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(tool, arguments) for tool, arguments in calls))
+    return latencies, failures, time.perf_counter() - started
+
+
+async def run_direct(calls: list[tuple[str, dict]], concurrency: int) -> tuple[list[float], int, float, float | None]:
+    sys.path.insert(0, str(ROOT))
+    import main
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # FastMCP enables INFO logging on import
+
+    async def call_tool(tool: str, arguments: dict) -> bool:
+        result = await getattr(main, tool)(**arguments)
+        return not result.startswith("Unable to")
+
+    async with main.app_lifespan(main.mcp):
+        latencies, failures, elapsed = await drive(calls, concurrency, call_tool)
+    return latencies, failures, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def server_peak_rss_mb() -> float | None:
+    """VmHWM of the spawned main.py process (Linux only)."""
+    for status in Path("/proc").glob("[0-9]*/status"):
+        try:
+            fields = dict(line.split(":", 1) for line in status.read_text().splitlines() if ":" in line)
+            cmdline = (status.parent / "cmdline").read_bytes()
+        except OSError:
+            continue
+        if int(fields.get("PPid", "0")) == os.getpid() and b"main.py" in cmdline and "VmHWM" in fields:
+            return int(fields["VmHWM"].split()[0]) / 1024
+    return None
+
+
+async def run_stdio(calls: list[tuple[str, dict]], concurrency: int) -> tuple[list[float], int, float, float | None]:
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    params = StdioServerParameters(command=sys.executable, args=[str(ROOT / "main.py")], env=dict(os.environ), cwd=str(ROOT))
+    with open(os.devnull, "w") as server_log:
+        async with stdio_client(params, errlog=server_log) as (read, write), ClientSession(read, write) as session:
+            await session.initialize()
+
+            async def call_tool(tool: str, arguments: dict) -> bool:
+                result = await session.call_tool(tool, arguments)
+                return not result.isError and not result.content[0].text.startswith("Unable to")
+
+            latencies, failures, elapsed = await drive(calls, concurrency, call_tool)
+            return latencies, failures, elapsed, server_peak_rss_mb()
+
+
+def percentile_ms(cuts: list[float], p: int) -> float:
+    return cuts[p - 1] * 1000
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("direct", "stdio", "both"), default="both")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--distinct", type=int, default=100, help="distinct identifiers per tool")
+    parser.add_argument("--tools", help=f"comma-separated subset of: {', '.join(WORKLOAD)}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-scale", type=int, default=1)
+    parser.add_argument("--fixtures", help="directory of recorded upstream responses (see mock_upstream.py)")
+    args = parser.parse_args()
+
+    mock, base_url = start_mock(args)
+    try:
+        configure_environment(base_url)
+        calls = build_calls(args)
+        modes = ("direct", "stdio") if args.mode == "both" else (args.mode,)
+        print(f"{len(calls)} calls, concurrency {args.concurrency}, mock latency {args.latency_ms}±{args.jitter_ms} ms, error rate {args.error_rate}\n")
+        print(f"{'mode':<8}{'calls/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'failed':>8}{'peak RSS MB':>13}{'upstream calls':>16}")
+        routes = {}
+        for mode in modes:
+            mock_stats(base_url, reset=True)
+            runner = run_direct if mode == "direct" else run_stdio
+            latencies, failures, elapsed, peak_rss = asyncio.run(runner(calls, args.concurrency))
+            cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+            stats = mock_stats(base_url)
+            routes[mode] = stats["routes"]
+            rss = f"{peak_rss:.1f}" if peak_rss is not None else "n/a"
+            print(f"{mode:<8}{len(latencies) / elapsed:>10.1f}{percentile_ms(cuts, 50):>10.1f}{percentile_ms(cuts, 95):>10.1f}"
+                  f"{percentile_ms(cuts, 99):>10.1f}{failures:>8}{rss:>13}{stats['total']:>16}")
+        print("\nupstream calls per route")
+        for route in sorted({route for counts in routes.values() for route in counts}):
+            print(f"  {route:<40}" + "".join(f"{mode}={counts.get(route, 0):<8}" for mode, counts in routes.items()))
+    finally:
+        mock.terminate()
+        mock.wait()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,239 @@
+"""Local stand-in for the LinkedIn, Facebook, Instagram and Serper APIs.
+
+Usage:
+    python benchmarks/mock_upstream.py [--port 0] [--latency-ms 50] [--jitter-ms 10]
+        [--error-rate 0] [--error-status 503] [--payload-scale 1] [--pages 3] [--fixtures DIR]
+
+Every host is served under its own prefix (/linkedin, /facebook, /instagram,
+/serper), so the server can be pointed at it with
+
+    LINKEDIN_API_BASE=http://127.0.0.1:PORT/linkedin  (and so on)
+
+Responses are fixtures: built-in synthetic bodies shaped like the real APIs
+(list sizes and text lengths grow with --payload-scale), or recorded
+responses from --fixtures, named after the route with "/" replaced by "_"
+(e.g. linkedin_profile_detail.json). List endpoints paginate over --pages
+pages. GET /__stats returns the number of calls per route and POST /__reset
+clears it. The first line printed is the base URL.
+"""
+import argparse
+import http.server
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+WORDS = ["growth", "AI", "launch", "team", "hiring", "results", "platform", "Zürich", "customer", "data"]
+
+
+def text(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def person(rng: random.Random) -> dict:
+    return {
+        "name": text(rng, 2),
+        "headline": text(rng, 12),
+        "url": f"https://www.linkedin.com/in/{rng.randrange(10**6)}/",
+        "profile_picture": "https://media.example.com/p.jpg",
+    }
+
+
+def post(rng: random.Random, scale: int) -> dict:
+    return {
+        "text": text(rng, rng.randint(30, 200) * scale),
+        "posted_at": "2025-01-01T00:00:00Z",
+        "likes": rng.randint(0, 5000),
+        "comments": rng.randint(0, 300),
+        "reposts": rng.randint(0, 100),
+        "reactions": {kind: rng.randint(0, 1000) for kind in ("like", "celebrate", "support", "love", "insightful", "funny")},
+        "author": person(rng),
+        "url": f"https://www.linkedin.com/posts/{rng.randrange(10**9)}",
+        "media": [{"url": "https://media.example.com/i.jpg", "width": 800, "height": 600}],
+    }
+
+
+def list_item(kind: str, rng: random.Random, scale: int) -> dict:
+    if kind == "posts":
+        return post(rng, scale)
+    if kind == "comments":
+        return {"text": text(rng, rng.randint(5, 60) * scale), "created_at": "2025-01-02", "likes": rng.randint(0, 50),
+                "author": person(rng), "post": {"text": text(rng, 30), "url": "https://www.linkedin.com/posts/1"}}
+    if kind == "reactions":
+        return {"reaction_type": rng.choice(["LIKE", "PRAISE", "EMPATHY", "INTEREST"]), **person(rng)}
+    if kind == "reposts":
+        return {**person(rng), "text": text(rng, 20 * scale), "reposted_at": "2025-01-03"}
+    if kind == "jobs":
+        return {"title": text(rng, 3), "company": {"name": text(rng, 2)}, "location": text(rng, 2),
+                "posted_at": "2025-01-04", "url": f"https://www.linkedin.com/jobs/view/{rng.randrange(10**9)}"}
+    if kind == "companies":
+        return {"name": text(rng, 2), "industry": text(rng, 2), "location": text(rng, 2), "followers": rng.randint(0, 10**6),
+                "description": text(rng, 40 * scale), "url": "https://www.linkedin.com/company/example/"}
+    return {"title": text(rng, 6), "link": "https://example.com/", "snippet": text(rng, 30 * scale)}
+
+
+# Route -> key of the item list (list endpoints) or None (single objects)
+LIST_ROUTES = {
+    "linkedin/profile/posts": "posts",
+    "linkedin/profile/comments": "comments",
+    "linkedin/profile/reactions": "reactions",
+    "linkedin/post/comments": "comments",
+    "linkedin/post/reactions": "reactions",
+    "linkedin/post/reposts": "reposts",
+    "linkedin/posts/search": "posts",
+    "linkedin/company/posts": "posts",
+    "linkedin/companies/search": "companies",
+    "linkedin/jobs/search": "jobs",
+    "serper/search": "organic",
+}
+
+
+def single_object(route: str, rng: random.Random, scale: int) -> dict | None:
+    if route == "linkedin/profile/detail":
+        return {
+            **person(rng), "location": text(rng, 2), "connections": 500, "followers": rng.randint(0, 10**5),
+            "experience": [{"title": text(rng, 3), "company": text(rng, 2), "duration": "2 yrs", "description": text(rng, 80)} for _ in range(5 * scale)],
+            "education": [{"school": text(rng, 3), "degree": text(rng, 3)} for _ in range(2 * scale)],
+            "skills": [text(rng, 2) for _ in range(20 * scale)],
+        }
+    if route == "linkedin/companies/detail":
+        return {"success": True, "data": {
+            "name": text(rng, 2), "tagline": text(rng, 8), "description": text(rng, 120 * scale), "industry": text(rng, 2),
+            "headquarters": text(rng, 2), "employee_count": rng.randint(1, 10**5), "followers": rng.randint(0, 10**6),
+            "founded": 2001, "specialities": [text(rng, 2) for _ in range(10 * scale)], "website": "https://example.com",
+            "locations": [{"city": text(rng, 1), "country": "US"} for _ in range(10 * scale)],
+        }}
+    if route == "linkedin/post/detail":
+        return {"success": True, "data": post(rng, scale)}
+    if route == "linkedin/jobs/detail":
+        return {"success": True, "data": {
+            "title": text(rng, 3), "company": {"name": text(rng, 2)}, "location": text(rng, 2), "employment_type": "Full-time",
+            "seniority_level": "Mid-Senior", "posted_at": "2025-01-04", "applicants": rng.randint(0, 500),
+            "description": text(rng, 300 * scale),
+        }}
+    if route == "linkedin/health":
+        return {"status": "ok"}
+    if route == "facebook/profile/details_url":
+        return {"name": text(rng, 2), "likes": rng.randint(0, 10**6), "followers": rng.randint(0, 10**6), "about": text(rng, 80 * scale),
+                "category": text(rng, 2), "location": text(rng, 2), "page_info": {"checkins": 1243, "rating": 4.8, "review_count": 567}}
+    if route == "instagram/ig_get_fb_profile_hover.php":
+        return {"username": "bench", "full_name": text(rng, 2), "biography": text(rng, 40 * scale), "followers": rng.randint(0, 10**6),
+                "following": 892, "posts_count": 1247, "is_verified": True, "engagement_rate": 4.2, "avg_likes": 6543}
+    return None
+
+
+class MockUpstream:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.calls: Counter[str] = Counter()
+        self.lock = threading.Lock()
+        self.bodies: dict[tuple[str, int], bytes | None] = {}
+        self.recorded = {}
+        if args.fixtures:
+            for path in Path(args.fixtures).glob("*.json"):
+                self.recorded[path.stem] = path.read_bytes()
+
+    def body(self, route: str, page: int) -> bytes | None:
+        """Encoded response for a route and page, built once and then replayed."""
+        key = (route, page)
+        if key not in self.bodies:
+            self.bodies[key] = self.build(route, page)
+        return self.bodies[key]
+
+    def build(self, route: str, page: int) -> bytes | None:
+        recorded = self.recorded.get(route.replace("/", "_"))
+        if recorded is not None:
+            return recorded
+        rng = random.Random(f"{route}:{page}")
+        scale = self.args.payload_scale
+        items_key = LIST_ROUTES.get(route)
+        if items_key is None:
+            data = single_object(route, rng, scale)
+            return None if data is None else json.dumps(data).encode()
+        items = [list_item(items_key, rng, scale) for _ in range(10 * scale)] if page <= self.args.pages else []
+        data = {"success": True, items_key: items, "has_more": page < self.args.pages}
+        return json.dumps(data).encode()
+
+
+def make_handler(mock: MockUpstream):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def reply(self, status: int, body: bytes = b"") -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if self.command == "POST" and "Content-Length" in self.headers:
+                self.rfile.read(int(self.headers["Content-Length"]))
+            if url.path == "/__stats":
+                with mock.lock:
+                    return self.reply(200, json.dumps({"total": sum(mock.calls.values()), "routes": dict(mock.calls)}).encode())
+            if url.path == "/__reset":
+                with mock.lock:
+                    mock.calls.clear()
+                return self.reply(200, b"{}")
+            route = url.path.strip("/")
+            with mock.lock:
+                mock.calls[route] += 1
+            args = mock.args
+            time.sleep(max(0.0, args.latency_ms + random.uniform(-args.jitter_ms, args.jitter_ms)) / 1000)
+            if random.random() < args.error_rate:
+                return self.reply(args.error_status, b'{"message":"mock upstream error"}')
+            page = parse_qs(url.query).get("page", ["1"])[0]
+            body = mock.body(route, int(page) if page.isdigit() else 1)
+            if body is None:
+                return self.reply(404, b'{"message":"unknown route"}')
+            self.reply(200, body)
+
+        do_POST = do_GET
+
+    return Handler
+
+
+class MockServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # the default backlog of 5 stalls concurrent clients on connect
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):  # clients hanging up on cancelled calls are expected
+            super().handle_error(request, client_address)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="0 picks a free port")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--payload-scale", type=int, default=1, help="multiplies list sizes and text lengths")
+    parser.add_argument("--pages", type=int, default=3, help="pages served by list endpoints")
+    parser.add_argument("--fixtures", help="directory of recorded responses overriding the built-in ones")
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    args = parse_args()
+    server = MockServer((args.host, args.port), make_handler(MockUpstream(args)))
+    print(f"http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,38 @@
 from typing import Any
+from collections.abc import AsyncIterator, Callable
+from collections import OrderedDict, deque
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import argparse
+import asyncio
+import atexit
+import bisect
+import contextvars
+import email.utils
+import functools
+import heapq
+import importlib.util
+import itertools
 import httpx
 import json
+import logging
+import logging.handlers
 from mcp.server.fastmcp import FastMCP
+from mcp.server.transport_security import TransportSecuritySettings
 import os
+import queue
+import random
+import re
+import sqlite3
+import ssl
+import sys
+import threading
+import time
+import uuid
+import weakref
+import zlib
+from urllib.parse import parse_qs, unquote, urlsplit
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,19 +46,1038 @@ LINKEDIN_HOST = "linkedin-scraper-api-real-time-fast-affordable.p.rapidapi.com"
 FACEBOOK_HOST = "facebook-scraper3.p.rapidapi.com"
 INSTAGRAM_HOST = "instagram-scraper-stable-api.p.rapidapi.com"
 
-LINKEDIN_API_BASE = f"https://{LINKEDIN_HOST}"
-FACEBOOK_API_BASE = f"https://{FACEBOOK_HOST}"
-INSTAGRAM_API_BASE = f"https://{INSTAGRAM_HOST}"
-SERPER_API_BASE = "https://google.serper.dev"
+# Base URLs can be pointed at a local mock server for testing
+LINKEDIN_API_BASE = os.getenv("LINKEDIN_API_BASE", f"https://{LINKEDIN_HOST}")
+FACEBOOK_API_BASE = os.getenv("FACEBOOK_API_BASE", f"https://{FACEBOOK_HOST}")
+INSTAGRAM_API_BASE = os.getenv("INSTAGRAM_API_BASE", f"https://{INSTAGRAM_HOST}")
+SERPER_API_BASE = os.getenv("SERPER_API_BASE", "https://google.serper.dev")
 
-# Check required keys
-if not RAPIDAPI_KEY:
-    raise ValueError("RAPIDAPI_KEY is not set in the environment variables")
-if not SERPER_API_KEY:
-    raise ValueError("SERPER_API_KEY is not set in the environment variables")
+# Fast start, for clients that spawn a server per conversation: missing keys
+# are reported on the first upstream call instead of at startup, HTTP clients
+# are created on first use, and tools are registered without output schemas
+# so the first tools/list is answered sooner.
+MCP_FAST_START = os.getenv("MCP_FAST_START", "false").lower() == "true"
+
+class MissingAPIKeyError(Exception):
+    """Raised when the API key an upstream host needs is not configured."""
+
+def check_api_keys(base_url: str | None = None) -> None:
+    """Raise if the key base_url needs, or with no base_url any required key, is missing."""
+    if base_url != SERPER_API_BASE and not RAPIDAPI_KEY:
+        raise MissingAPIKeyError("RAPIDAPI_KEY is not set in the environment variables")
+    if base_url in (None, SERPER_API_BASE) and not SERPER_API_KEY:
+        raise MissingAPIKeyError("SERPER_API_KEY is not set in the environment variables")
+
+if not MCP_FAST_START:
+    check_api_keys()
+
+# ---- LOGGING ----
+# stdout carries the stdio transport's JSON-RPC frames, so diagnostics go to
+# stderr or LOG_FILE. Records are handed to a bounded queue and written by a
+# background thread, so the event loop never blocks on a slow pipe or disk;
+# if the queue is full, records are dropped and counted. Repeated messages
+# are sampled: the first LOG_SAMPLE_BURST per second pass, then one in
+# LOG_SAMPLE_EVERY, and the next record that passes reports how many were
+# suppressed.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.getenv("LOG_FILE", "")  # empty = stderr
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json (one object per line) or text
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_SAMPLE_BURST = int(os.getenv("LOG_SAMPLE_BURST", "20"))
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "100"))
+
+# Request context attached to every record logged while serving a tool call
+request_id: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="")
+current_tool: contextvars.ContextVar[str] = contextvars.ContextVar("current_tool", default="")
+# Endpoint name of the request being sent, so upstream attempts are attributed to it
+current_endpoint: contextvars.ContextVar[str] = contextvars.ContextVar("current_endpoint", default="")
+
+LOG_FIELDS = ("request_id", "tool", "endpoint", "status", "latency_ms", "response_bytes", "error", "suppressed")
+
+class LogContextFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        record.tool = current_tool.get()
+        if not getattr(record, "endpoint", ""):
+            record.endpoint = current_endpoint.get()
+        return True
+
+class LogSampler(logging.Filter):
+    def __init__(self):
+        super().__init__()
+        self._windows: dict[tuple, list[int]] = {}  # (level, message template) -> [second, records seen]
+        self._suppressed: dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.levelno, record.msg)
+        second = int(time.monotonic())
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or window[0] != second:
+                window = self._windows[key] = [second, 0]
+            window[1] += 1
+            if window[1] <= LOG_SAMPLE_BURST or window[1] % LOG_SAMPLE_EVERY == 0:
+                record.suppressed = self._suppressed.pop(key, 0)
+                return True
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return False
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class StructuredFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {name: getattr(record, name, None) for name in LOG_FIELDS}
+        fields = {name: value for name, value in fields.items() if value not in (None, "", 0)}
+        if LOG_FORMAT == "text":
+            context = " ".join(f"{name}={value}" for name, value in fields.items())
+            return f"{self.formatTime(record)} {record.levelname} {record.getMessage()}" + (f" [{context}]" if context else "")
+        entry = {"time": self.formatTime(record), "level": record.levelname, "message": record.getMessage(), **fields}
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+def configure_logging() -> tuple[logging.Logger, BoundedQueueHandler]:
+    server_logger = logging.getLogger("social_web_scraper")
+    server_logger.setLevel(LOG_LEVEL)
+    server_logger.propagate = False  # FastMCP installs its own root handler
+    log_queue: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+    queue_handler = BoundedQueueHandler(log_queue)
+    queue_handler.addFilter(LogContextFilter())
+    queue_handler.addFilter(LogSampler())
+    server_logger.addHandler(queue_handler)
+    output = logging.FileHandler(LOG_FILE, encoding="utf-8") if LOG_FILE else logging.StreamHandler(sys.stderr)
+    output.setFormatter(StructuredFormatter())
+    listener = logging.handlers.QueueListener(log_queue, output)
+    listener.start()
+    atexit.register(listener.stop)  # flush what is still queued
+    # Upstream requests are logged here with request context; httpx's own per-request INFO lines are redundant
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    return server_logger, queue_handler
+
+logger, log_queue_handler = configure_logging()
+
+# ---- JSON SERIALIZATION ----
+# Tool responses are emitted compact by default: indentation only costs CPU,
+# stdio bytes and model context tokens. orjson or msgspec are used when
+# installed, with the standard library as fallback.
+RESPONSE_JSON_STYLE = os.getenv("RESPONSE_JSON_STYLE", "compact")  # "compact" or "pretty"
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")  # "auto", "orjson", "msgspec" or "json"
+
+def _select_json_backend(preference: str) -> str:
+    candidates = ("orjson", "msgspec") if preference == "auto" else (preference,)
+    for name in candidates:
+        if name in ("orjson", "msgspec") and importlib.util.find_spec(name) is not None:
+            return name
+    return "json"
+
+json_backend = _select_json_backend(JSON_BACKEND)
+if json_backend == "orjson":
+    import orjson
+elif json_backend == "msgspec":
+    import msgspec
+
+def json_loads(data: bytes | str) -> Any:
+    """Decode JSON straight from response bytes."""
+    if json_backend == "orjson":
+        return orjson.loads(data)
+    if json_backend == "msgspec":
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+    return json.loads(data)
+
+def json_dumps_bytes(data: Any, pretty: bool = False) -> bytes:
+    """Encode to UTF-8 JSON bytes; values JSON can't represent are stringified."""
+    if json_backend == "orjson":
+        return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if json_backend == "msgspec":
+        encoded = msgspec.json.encode(data, enc_hook=str)
+        return msgspec.json.format(encoded, indent=2) if pretty else encoded
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False, default=str).encode()
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str).encode()
+
+def dump_json(data: Any) -> str:
+    """Serialize a tool response in the configured RESPONSE_JSON_STYLE."""
+    return json_dumps_bytes(data, pretty=RESPONSE_JSON_STYLE == "pretty").decode()
+
+# ---- METRICS ----
+# Per-tool end-to-end latency and response size, plus per-endpoint cache hits,
+# upstream attempt latency, upstream payload size, response size and error
+# classes. Histograms use fixed buckets, so recording is O(1) and the
+# OpenMetrics export needs no extra state.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() != "false"
+METRICS_FILE = os.getenv("METRICS_FILE", "")  # "*.json" gets a JSON snapshot, anything else OpenMetrics text
+METRICS_DUMP_INTERVAL = float(os.getenv("METRICS_DUMP_INTERVAL", "60"))  # seconds between file dumps
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is the +Inf bucket
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-quantile (the observed maximum past the last bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        summary = {"count": self.count, "sum": self.sum, "mean": self.sum / self.count if self.count else None}
+        summary.update(p50=self.quantile(0.5), p95=self.quantile(0.95), p99=self.quantile(0.99), max=self.max)
+        return {key: round(value, 6) if isinstance(value, float) else value for key, value in summary.items()}
+
+def error_class(error: BaseException) -> str:
+    """Short, low-cardinality label for an exception raised while serving a request."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"http_{error.response.status_code}"
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.TransportError):
+        return "transport"
+    if isinstance(error, RateLimitExceeded):
+        return "rate_limited"
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, (DeadlineExceeded, TimeoutError)):
+        return "deadline_exceeded"
+    if isinstance(error, asyncio.CancelledError):
+        return "cancelled"
+    if isinstance(error, MissingAPIKeyError):
+        return "missing_api_key"
+    if isinstance(error, ValueError):
+        return "invalid_response"
+    return type(error).__name__
+
+class ServerMetrics:
+    def __init__(self):
+        self.started_at = time.time()
+        self.tools: dict[str, dict] = {}
+        self.endpoints: dict[str, dict] = {}
+
+    def _tool(self, name: str) -> dict:
+        stats = self.tools.get(name)
+        if stats is None:
+            stats = self.tools[name] = {
+                "calls": 0,
+                "errors": {},
+                "latency_seconds": Histogram(LATENCY_BUCKETS),
+                "response_bytes": Histogram(SIZE_BUCKETS)
+            }
+        return stats
+
+    def _endpoint(self, name: str) -> dict:
+        stats = self.endpoints.get(name)
+        if stats is None:
+            stats = self.endpoints[name] = {
+                "requests": 0,
+                "cache_hits": 0,
+                "errors": {},
+                "upstream_latency_seconds": Histogram(LATENCY_BUCKETS),
+                "upstream_bytes": Histogram(SIZE_BUCKETS),
+                "response_bytes": Histogram(SIZE_BUCKETS)
+            }
+        return stats
+
+    def record_tool(self, name: str, seconds: float, response_bytes: int | None = None, error: str | None = None) -> None:
+        if not METRICS_ENABLED:
+            return
+        stats = self._tool(name)
+        stats["calls"] += 1
+        stats["latency_seconds"].observe(seconds)
+        if response_bytes is not None:
+            stats["response_bytes"].observe(response_bytes)
+        if error:
+            stats["errors"][error] = stats["errors"].get(error, 0) + 1
+
+    def record_request(self, endpoint: str, cache_hit: bool) -> None:
+        if not METRICS_ENABLED:
+            return
+        stats = self._endpoint(endpoint)
+        stats["requests"] += 1
+        stats["cache_hits"] += cache_hit
+
+    def record_upstream(self, endpoint: str, seconds: float, payload_bytes: int) -> None:
+        if not METRICS_ENABLED:
+            return
+        stats = self._endpoint(endpoint)
+        stats["upstream_latency_seconds"].observe(seconds)
+        stats["upstream_bytes"].observe(payload_bytes)
+
+    def record_response(self, endpoint: str, response_bytes: int) -> None:
+        if METRICS_ENABLED:
+            self._endpoint(endpoint)["response_bytes"].observe(response_bytes)
+
+    def record_error(self, endpoint: str, error: BaseException) -> None:
+        if not METRICS_ENABLED:
+            return
+        errors = self._endpoint(endpoint)["errors"]
+        label = error_class(error)
+        errors[label] = errors.get(label, 0) + 1
+
+    def snapshot(self) -> dict:
+        def expand(stats: dict) -> dict:
+            return {key: value.snapshot() if isinstance(value, Histogram) else dict(value) if isinstance(value, dict) else value
+                    for key, value in stats.items()}
+
+        return {
+            "enabled": METRICS_ENABLED,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "tools": {name: expand(stats) for name, stats in sorted(self.tools.items())},
+            "endpoints": {name: expand(stats) for name, stats in sorted(self.endpoints.items())}
+        }
+
+    def openmetrics(self) -> str:
+        """Render all metrics in the OpenMetrics text exposition format (readable by Prometheus)."""
+        lines = []
+        for kind, label, table in (("tool", "tool", self.tools), ("endpoint", "endpoint", self.endpoints)):
+            if not table:
+                continue
+            metric_names = next(iter(table.values())).keys()
+            for metric in metric_names:
+                name = f"mcp_{kind}_{metric}"
+                histogram = isinstance(next(iter(table.values()))[metric], Histogram)
+                if metric == "errors":
+                    lines.append(f"# TYPE {name} counter")
+                    for key, stats in sorted(table.items()):
+                        for error, count in sorted(stats[metric].items()):
+                            lines.append(f'{name}_total{{{label}="{_label_value(key)}",class="{_label_value(error)}"}} {count}')
+                elif histogram:
+                    lines.append(f"# TYPE {name} histogram")
+                    for key, stats in sorted(table.items()):
+                        hist = stats[metric]
+                        cumulative = 0
+                        for bound, count in zip(hist.buckets + (float("inf"),), hist.counts):
+                            cumulative += count
+                            le = "+Inf" if bound == float("inf") else repr(float(bound))
+                            lines.append(f'{name}_bucket{{{label}="{_label_value(key)}",le="{le}"}} {cumulative}')
+                        lines.append(f'{name}_count{{{label}="{_label_value(key)}"}} {hist.count}')
+                        lines.append(f'{name}_sum{{{label}="{_label_value(key)}"}} {hist.sum}')
+                else:
+                    lines.append(f"# TYPE {name} counter")
+                    for key, stats in sorted(table.items()):
+                        lines.append(f'{name}_total{{{label}="{_label_value(key)}"}} {stats[metric]}')
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+metrics = ServerMetrics()
+
+def write_metrics_file(path: str = METRICS_FILE) -> None:
+    """Atomically replace path with the current metrics (JSON for *.json, OpenMetrics text otherwise)."""
+    if path.endswith(".json"):
+        body = json_dumps_bytes(metrics.snapshot(), pretty=True)
+    else:
+        body = metrics.openmetrics().encode()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+
+async def dump_metrics_periodically() -> None:
+    while True:
+        await asyncio.sleep(METRICS_DUMP_INTERVAL)
+        try:
+            await asyncio.to_thread(write_metrics_file)
+        except OSError as e:
+            logger.error("Error writing metrics file: %s", e)
+
+def instrumented(tool):
+    """Run an MCP tool within its deadline, recording latency, response size and failures, and log the call."""
+    budget = TOOL_DEADLINES.get(tool.__name__, TOOL_DEADLINE)
+
+    async def run_within_deadline(*args, **kwargs):
+        try:
+            async with asyncio.timeout(budget + TOOL_DEADLINE_GRACE) as scope:
+                return await tool(*args, **kwargs)
+        except TimeoutError:
+            if not scope.expired():
+                raise
+            return f"Tool call exceeded its {budget:g}s deadline."
+
+    @functools.wraps(tool)
+    async def wrapper(*args, **kwargs):
+        tokens = (
+            (request_id, request_id.set(uuid.uuid4().hex[:12])),
+            (current_tool, current_tool.set(tool.__name__)),
+            (request_deadline, request_deadline.set(time.monotonic() + budget)),
+        )
+        started = time.perf_counter()
+        try:
+            result = await run_within_deadline(*args, **kwargs)
+        except BaseException as e:
+            elapsed = time.perf_counter() - started
+            metrics.record_tool(tool.__name__, elapsed, error=error_class(e))
+            level = logging.INFO if isinstance(e, asyncio.CancelledError) else logging.WARNING
+            logger.log(level, "Tool call failed: %r", e, extra={"status": error_class(e), "latency_ms": round(elapsed * 1000, 1)})
+            raise
+        else:
+            elapsed = time.perf_counter() - started
+            # Tools report failures as messages rather than exceptions
+            error = None
+            if isinstance(result, str) and result.startswith("Unable to"):
+                error = "unavailable"
+            elif isinstance(result, str) and result.startswith("Tool call exceeded"):
+                error = "deadline_exceeded"
+            size = len(result.encode()) if isinstance(result, str) else None
+            metrics.record_tool(tool.__name__, elapsed, size, error)
+            logger.info("Tool call", extra={"status": error or "ok", "latency_ms": round(elapsed * 1000, 1), "response_bytes": size})
+            return result
+        finally:
+            for var, token in reversed(tokens):
+                var.reset(token)
+    return wrapper
+
+# ---- HTTP TRANSPORT CONFIGURATION ----
+# One keep-alive pool per upstream host, shared by every tool call for the
+# lifetime of the server process.
+HTTP_POOL_LIMITS = {
+    "max_connections": int(os.getenv("HTTP_MAX_CONNECTIONS", "20")),
+    "max_keepalive_connections": int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10")),
+    "keepalive_expiry": float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "90")),
+}
+UPSTREAM_TIMEOUT = 30.0
+
+# HTTP/2 is negotiated via ALPN, so hosts that don't offer it fall back to
+# HTTP/1.1. It needs the optional `h2` package (`httpx[http2]`).
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() != "false" and importlib.util.find_spec("h2") is not None
+
+UPSTREAM_HEADERS = {
+    LINKEDIN_API_BASE: {"x-rapidapi-key": RAPIDAPI_KEY, "x-rapidapi-host": LINKEDIN_HOST},
+    FACEBOOK_API_BASE: {"x-rapidapi-key": RAPIDAPI_KEY, "x-rapidapi-host": FACEBOOK_HOST},
+    INSTAGRAM_API_BASE: {"x-rapidapi-key": RAPIDAPI_KEY, "x-rapidapi-host": INSTAGRAM_HOST},
+    SERPER_API_BASE: {"X-API-KEY": SERPER_API_KEY, "Content-Type": "application/json"},
+}
+
+# Short names used in status tools and metrics
+UPSTREAM_NAMES = {
+    LINKEDIN_API_BASE: "linkedin",
+    FACEBOOK_API_BASE: "facebook",
+    INSTAGRAM_API_BASE: "instagram",
+    SERPER_API_BASE: "serper",
+}
+
+_http_clients: dict[str, httpx.AsyncClient] = {}
+
+@functools.cache
+def upstream_ssl_context() -> ssl.SSLContext:
+    """TLS context shared by every upstream pool; loading the CA bundle is most of a client's construction cost."""
+    return httpx.create_ssl_context()
+
+def get_http_client(base_url: str) -> httpx.AsyncClient:
+    """Return the pooled client for an upstream base URL, creating it on first use."""
+    client = _http_clients.get(base_url)
+    if client is None or client.is_closed:
+        check_api_keys(base_url)
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            headers=UPSTREAM_HEADERS[base_url],
+            verify=upstream_ssl_context(),
+            http2=HTTP2_ENABLED,
+            limits=httpx.Limits(**HTTP_POOL_LIMITS),
+            timeout=UPSTREAM_TIMEOUT
+        )
+        _http_clients[base_url] = client
+    return client
+
+async def close_http_clients() -> None:
+    """Close every pooled client and drop its keep-alive connections."""
+    clients = list(_http_clients.values())
+    _http_clients.clear()
+    for client in clients:
+        await client.aclose()
+
+# ---- RATE LIMITING ----
+# Client-side token bucket per upstream host, in requests per minute. The
+# Instagram plan documents 50/min (docs/Instagram_api_enpoints.md); adjust the
+# others to match your RapidAPI/Serper subscriptions.
+RATE_LIMITS = {
+    LINKEDIN_API_BASE: float(os.getenv("LINKEDIN_RATE_LIMIT", "60")),
+    FACEBOOK_API_BASE: float(os.getenv("FACEBOOK_RATE_LIMIT", "60")),
+    INSTAGRAM_API_BASE: float(os.getenv("INSTAGRAM_RATE_LIMIT", "50")),
+    SERPER_API_BASE: float(os.getenv("SERPER_RATE_LIMIT", "300")),
+}
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "10"))
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "20"))
+
+# Lower value is served first when calls queue for the same host. Prefetch
+# calls never queue at all: they only take a token that is free right now.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+PRIORITY_PREFETCH = 2
+request_priority: contextvars.ContextVar[int] = contextvars.ContextVar("request_priority", default=PRIORITY_INTERACTIVE)
+
+class RateLimitExceeded(Exception):
+    """Raised when a call would have to queue longer than RATE_LIMIT_MAX_WAIT."""
+
+class TokenBucket:
+    """Token bucket that queues excess calls by priority and rejects them past a bounded wait."""
+
+    def __init__(self, name: str, rate_per_minute: float, burst: int):
+        self.name = name
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, min(burst, int(rate_per_minute) or 1))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self.contended_at = float("-inf")  # last time a caller had to queue
+        self.upstream_quota: dict[str, str] = {}
+        self.stats = {"granted": 0, "queued": 0, "rejected": 0, "throttled_by_upstream": 0, "total_wait_seconds": 0.0}
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _prune(self) -> None:
+        """Forget queued callers that timed out or were cancelled; _dispatch() only skips them at the head."""
+        if any(f.done() for _, _, f in self._waiters):
+            self._waiters = [waiter for waiter in self._waiters if not waiter[2].done()]
+            heapq.heapify(self._waiters)
+
+    def _dispatch(self) -> None:
+        """Hand available tokens to queued callers in priority order and re-arm the timer."""
+        self._timer = None
+        self._refill()
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():  # timed out or cancelled while queued
+                heapq.heappop(self._waiters)
+                continue
+            if self.tokens < 1:
+                break
+            heapq.heappop(self._waiters)
+            self.tokens -= 1
+            future.set_result(None)
+        if self._waiters and self._timer is None:
+            delay = (1 - self.tokens) / self.rate
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def estimated_wait(self, priority: int) -> float:
+        ahead = sum(1 for p, _, f in self._waiters if p <= priority and not f.done())
+        return max(0.0, (ahead + 1 - self.tokens) / self.rate)
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE, max_wait: float = RATE_LIMIT_MAX_WAIT) -> None:
+        self._refill()
+        self._prune()
+        if not self._waiters and self.tokens >= 1:
+            self.tokens -= 1
+            self.stats["granted"] += 1
+            return
+        if priority >= PRIORITY_PREFETCH:
+            self.stats["rejected"] += 1
+            raise RateLimitExceeded(f"{self.name} has no spare capacity for prefetching")
+        self.contended_at = time.monotonic()
+        if self.estimated_wait(priority) > max_wait:
+            self.stats["rejected"] += 1
+            raise RateLimitExceeded(f"{self.name} rate limit budget exhausted")
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self.stats["queued"] += 1
+        self._dispatch()
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(future, max_wait)
+        except asyncio.TimeoutError:
+            self.stats["rejected"] += 1
+            raise RateLimitExceeded(f"{self.name} rate limit wait exceeded {max_wait:.0f}s") from None
+        self.stats["granted"] += 1
+        self.stats["total_wait_seconds"] += time.monotonic() - started
+
+    def time_for(self, calls: int) -> float:
+        """Seconds until this many more calls could have been granted at the configured rate."""
+        self._refill()
+        return max(0.0, calls - self.tokens) / self.rate
+
+    def has_spare_capacity(self, reserve: float, cooldown: float) -> bool:
+        """True when no caller is queued or has queued in the last cooldown seconds and more than reserve of the bucket is free."""
+        self._refill()
+        self._prune()
+        return (
+            not self._waiters
+            and time.monotonic() - self.contended_at >= cooldown
+            and self.tokens >= 1 + reserve * self.capacity
+        )
+
+    def record_response(self, response: httpx.Response) -> None:
+        """Track the provider's own quota headers and back off on 429."""
+        quota = {
+            name.lower(): value for name, value in response.headers.items()
+            if name.lower().startswith("x-ratelimit-")
+        }
+        if quota:
+            self.upstream_quota = quota
+        if response.status_code == 429:
+            self.stats["throttled_by_upstream"] += 1
+            self._refill()
+            self.tokens = 0.0
+
+    def snapshot(self) -> dict:
+        self._refill()
+        return {
+            "rate_per_minute": round(self.rate * 60, 2),
+            "burst": self.capacity,
+            "tokens_available": round(self.tokens, 2),
+            "queued_now": sum(1 for _, _, f in self._waiters if not f.done()),
+            **{key: round(value, 3) for key, value in self.stats.items()},
+            "upstream_quota": self.upstream_quota,
+        }
+
+rate_limiters = {
+    base_url: TokenBucket(UPSTREAM_NAMES[base_url], rate, RATE_LIMIT_BURST)
+    for base_url, rate in RATE_LIMITS.items()
+}
+
+# ---- DEADLINES ----
+# Every tool call gets a time budget. The absolute deadline travels with the
+# call in a context variable, so rate limit waits, attempt timeouts, retries,
+# pagination and batch items all draw on the same budget. Work that no longer
+# fits fails fast with DeadlineExceeded, and @instrumented cancels the call
+# outright TOOL_DEADLINE_GRACE seconds after the deadline.
+TOOL_DEADLINE = float(os.getenv("TOOL_DEADLINE", "60"))  # seconds, for tools not listed below
+TOOL_DEADLINES = {
+    "check_api_health": 10.0,
+    "get_personal_profiles_batch": 300.0,
+    "get_company_profiles_batch": 300.0,
+    "get_posts_details_batch": 300.0,
+    "get_instagram_profiles_batch": 300.0,
+    "sync_watchlist": 600.0,
+}
+# Per-tool overrides, e.g. TOOL_DEADLINES="search_jobs=20,get_posts_details_batch=600"
+for _override in filter(None, os.getenv("TOOL_DEADLINES", "").split(",")):
+    _tool_name, _, _seconds = _override.partition("=")
+    TOOL_DEADLINES[_tool_name.strip()] = float(_seconds)
+TOOL_DEADLINE_GRACE = 1.0
+MIN_ATTEMPT_BUDGET = 0.25  # don't start an upstream attempt with less time left than this
+
+# Absolute time.monotonic() deadline of the tool call being served, if any
+request_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar("request_deadline", default=None)
+
+class DeadlineExceeded(Exception):
+    """Raised when a call's time budget runs out before the upstream work is done."""
+
+# ---- RETRY POLICY ----
+# Transient upstream failures are retried with exponential backoff and full
+# jitter, honouring Retry-After, until max_attempts or the overall deadline.
+RETRY_POLICY = {
+    "max_attempts": int(os.getenv("RETRY_MAX_ATTEMPTS", "3")),
+    "base_delay": float(os.getenv("RETRY_BASE_DELAY", "0.5")),
+    "max_delay": float(os.getenv("RETRY_MAX_DELAY", "8")),
+    "deadline": float(os.getenv("RETRY_DEADLINE", "45")),
+}
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# GETs are always safe to repeat. POST endpoints listed here are read-only
+# searches; any other POST is only retried when the request never reached
+# the server (connect errors) or was explicitly rejected with 429.
+IDEMPOTENT_POSTS = {(SERPER_API_BASE, "/search")}
+
+retry_stats = {name: {"retries": 0, "gave_up": 0} for name in UPSTREAM_NAMES.values()}
+
+def is_idempotent(base_url: str, method: str, path: str) -> bool:
+    return method in ("GET", "HEAD") or (base_url, path) in IDEMPOTENT_POSTS
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def retry_delay(attempt: int, response: httpx.Response | None) -> float:
+    if response is not None:
+        retry_after = parse_retry_after(response.headers.get("retry-after"))
+        if retry_after is not None:
+            return retry_after
+    return random.uniform(0, min(RETRY_POLICY["max_delay"], RETRY_POLICY["base_delay"] * 2 ** attempt))
+
+async def send_with_retries(base_url: str, method: str, path: str, params: dict | None = None, json_body: dict | None = None) -> Any:
+    """Send a request through the pooled client for base_url and return the decoded JSON body.
+
+    Retries transient failures according to RETRY_POLICY; every attempt takes
+    its own rate limit token. The call's deadline bounds the whole sequence.
+    """
+    limiter = rate_limiters[base_url]
+    stats = retry_stats[UPSTREAM_NAMES[base_url]]
+    idempotent = is_idempotent(base_url, method, path)
+    deadline = time.monotonic() + RETRY_POLICY["deadline"]
+    if request_deadline.get() is not None:
+        deadline = min(deadline, request_deadline.get())
+    attempt = 0
+    while True:
+        response = None
+        if deadline - time.monotonic() < MIN_ATTEMPT_BUDGET:
+            raise DeadlineExceeded(f"no time left for {method} {path}")
+        try:
+            await limiter.acquire(request_priority.get(), min(RATE_LIMIT_MAX_WAIT, deadline - time.monotonic()))
+            started = time.perf_counter()
+            attempt_timeout = min(UPSTREAM_TIMEOUT, deadline - time.monotonic())
+            try:
+                response = await get_http_client(base_url).request(
+                    method, path, params=params, json=json_body, timeout=attempt_timeout
+                )
+            except httpx.TimeoutException as e:
+                # Cut short by the caller's budget rather than a slow host: don't retry or blame the host
+                if attempt_timeout < UPSTREAM_TIMEOUT:
+                    raise DeadlineExceeded(f"{method} {path} did not finish within the call's deadline") from e
+                raise
+            elapsed = time.perf_counter() - started
+            metrics.record_upstream(current_endpoint.get() or path, elapsed, len(response.content))
+            logger.debug("%s %s", method, path, extra={"status": response.status_code, "latency_ms": round(elapsed * 1000, 1)})
+            limiter.record_response(response)
+            response.raise_for_status()
+            return json_loads(response.content)
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            if status not in RETRYABLE_STATUS_CODES or (not idempotent and status != 429):
+                raise
+            error = e
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+            error = e
+        except httpx.TransportError as e:
+            if not idempotent:
+                raise
+            error = e
+        attempt += 1
+        delay = retry_delay(attempt, response)
+        if attempt >= RETRY_POLICY["max_attempts"] or time.monotonic() + delay >= deadline:
+            stats["gave_up"] += 1
+            raise error
+        stats["retries"] += 1
+        logger.info("Retrying %s %s in %.2fs (attempt %d): %s", method, path, delay, attempt + 1, error, extra={"status": error_class(error)})
+        await asyncio.sleep(delay)
+
+# ---- CIRCUIT BREAKERS ----
+# A host whose requests keep failing is marked open and fails fast instead of
+# stalling every tool call for the full timeout. After CIRCUIT_RESET_TIMEOUT a
+# single probe is let through (the health endpoint where the provider has
+# one, otherwise the next real request); success closes the circuit again.
+CIRCUIT_BREAKER = {
+    "failure_threshold": int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+    "error_rate": float(os.getenv("CIRCUIT_ERROR_RATE", "0.5")),
+    "window": int(os.getenv("CIRCUIT_WINDOW", "20")),
+    "min_calls": int(os.getenv("CIRCUIT_MIN_CALLS", "10")),
+    "reset_timeout": float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30")),
+    "probe_timeout": 5.0,
+}
+CIRCUIT_PROBES = {LINKEDIN_API_BASE: "/health"}
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a host whose circuit is open."""
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """Server errors and transport failures count against a host; 4xx answers don't."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+class CircuitBreaker:
+    """Per-host breaker tripping on consecutive failures or a high error rate over a sliding window."""
+
+    def __init__(self, base_url: str, probe_path: str | None = None):
+        self.base_url = base_url
+        self.name = UPSTREAM_NAMES[base_url]
+        self.probe_path = probe_path
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self.outcomes: deque[bool] = deque(maxlen=CIRCUIT_BREAKER["window"])
+        self._probing = False
+        self.stats = {"trips": 0, "fast_failures": 0, "probes": 0}
+
+    def _trip(self) -> None:
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.consecutive_failures = 0
+        self.outcomes.clear()
+        self.stats["trips"] += 1
+
+    def _close(self) -> None:
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.outcomes.clear()
+
+    def _fail_fast(self) -> None:
+        self.stats["fast_failures"] += 1
+        retry_in = max(0.0, self.opened_at + CIRCUIT_BREAKER["reset_timeout"] - time.monotonic())
+        raise CircuitOpenError(f"{self.name} API is unavailable (circuit open, retry in {retry_in:.0f}s)")
+
+    async def before_call(self) -> tuple[bool, float]:
+        """Fail fast while open; in half-open state let exactly one probe through.
+
+        Returns the call's ticket for record(): whether it is the probe, and
+        the open period it started in.
+        """
+        if self.state == "closed":
+            return False, self.opened_at
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < CIRCUIT_BREAKER["reset_timeout"]:
+                self._fail_fast()
+            self.state = "half_open"
+        if self._probing:
+            self._fail_fast()
+        self._probing = True
+        self.stats["probes"] += 1
+        if self.probe_path is None:
+            return True, self.opened_at  # the caller's own request is the probe
+        try:
+            healthy = await self._probe()
+        finally:
+            self._probing = False
+        if not healthy:
+            self._trip()
+            self._fail_fast()
+        self._close()
+        return False, self.opened_at
+
+    async def _probe(self) -> bool:
+        await rate_limiters[self.base_url].acquire(request_priority.get())
+        try:
+            response = await get_http_client(self.base_url).get(self.probe_path, timeout=CIRCUIT_BREAKER["probe_timeout"])
+            return response.status_code < 500
+        except httpx.TransportError:
+            return False
+
+    def record(self, ticket: tuple[bool, float], failed: bool | None) -> None:
+        """Record the outcome of a call admitted with ticket; None means the call never reached the host."""
+        probe, opened_at = ticket
+        if probe:
+            self._probing = False
+            if failed is not None and self.state == "half_open" and opened_at == self.opened_at:
+                if failed:
+                    self._trip()
+                else:
+                    self._close()
+            return
+        if failed is None or self.state != "closed" or opened_at != self.opened_at:
+            return  # calls that started before the circuit last opened say nothing about the host now
+        self.outcomes.append(failed)
+        self.consecutive_failures = self.consecutive_failures + 1 if failed else 0
+        failures = sum(self.outcomes)
+        if self.consecutive_failures >= CIRCUIT_BREAKER["failure_threshold"] or (
+            len(self.outcomes) >= CIRCUIT_BREAKER["min_calls"]
+            and failures / len(self.outcomes) >= CIRCUIT_BREAKER["error_rate"]
+        ):
+            self._trip()
+
+    def snapshot(self) -> dict:
+        status = {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "recent_error_rate": round(sum(self.outcomes) / len(self.outcomes), 3) if self.outcomes else 0.0,
+            "recent_calls": len(self.outcomes),
+            **self.stats,
+        }
+        if self.state == "open":
+            status["retry_in_seconds"] = round(max(0.0, self.opened_at + CIRCUIT_BREAKER["reset_timeout"] - time.monotonic()), 1)
+        return status
+
+circuit_breakers = {base_url: CircuitBreaker(base_url, CIRCUIT_PROBES.get(base_url)) for base_url in UPSTREAM_NAMES}
+
+async def send_upstream(base_url: str, method: str, path: str, params: dict | None = None, json_body: dict | None = None) -> Any:
+    """Send a request to an upstream host, guarded by its circuit breaker."""
+    breaker = circuit_breakers[base_url]
+    ticket = await breaker.before_call()
+    try:
+        data = await send_with_retries(base_url, method, path, params, json_body)
+    except (httpx.HTTPStatusError, httpx.TransportError) as e:
+        breaker.record(ticket, is_upstream_failure(e))
+        raise
+    except BaseException:
+        breaker.record(ticket, None)
+        raise
+    breaker.record(ticket, False)
+    return data
+
+# ---- IN-FLIGHT REQUEST COALESCING ----
+# Concurrent identical requests (same host, method, path, params and body)
+# share one upstream call; every caller receives the same parsed result.
+# The shared call runs at its first caller's priority but under no caller's
+# deadline: each caller waits for it only as long as its own deadline allows,
+# and a caller never joins a call queued at a lower priority than its own.
+_in_flight: dict[str, tuple[asyncio.Task, int]] = {}
+_in_flight_waiters: dict[asyncio.Task, int] = {}
+coalescing_stats = {"upstream_calls": 0, "coalesced_calls": 0}
+
+def _finish_in_flight(key: str, task: asyncio.Task) -> None:
+    if _in_flight.get(key, (None,))[0] is task:
+        del _in_flight[key]
+    if not task.cancelled():
+        task.exception()  # mark retrieved even if every caller went away
+
+def _shared_context(priority: int) -> contextvars.Context:
+    """Copy of the caller's context for a shared call: the caller's priority, no deadline."""
+    context = contextvars.copy_context()
+    context.run(request_deadline.set, None)
+    context.run(request_priority.set, priority)
+    return context
+
+async def _send_shared(base_url: str, method: str, path: str, params: dict | None, json_body: dict | None, on_response) -> Any:
+    data = await send_upstream(base_url, method, path, params, json_body)
+    if data and on_response is not None:
+        on_response(data)
+    return data
+
+async def upstream_request(base_url: str, method: str, path: str, params: dict | None = None, json_body: dict | None = None,
+                           on_response: Callable[[Any], None] | None = None) -> Any:
+    """Send an upstream request, joining an identical one that is already in flight.
+
+    on_response is called once per upstream response, by the caller that sent it.
+    """
+    key = json.dumps([base_url, method, path, params, json_body], sort_keys=True, default=str)
+    priority = request_priority.get()
+    task, task_priority = _in_flight.get(key, (None, None))
+    if task is None or task_priority > priority:
+        task = asyncio.create_task(
+            _send_shared(base_url, method, path, params, json_body, on_response), context=_shared_context(priority)
+        )
+        _in_flight[key] = (task, priority)
+        task.add_done_callback(functools.partial(_finish_in_flight, key))
+        coalescing_stats["upstream_calls"] += 1
+    else:
+        coalescing_stats["coalesced_calls"] += 1
+    deadline = request_deadline.get()
+    # Shield so one caller being cancelled doesn't cancel the call for the others;
+    # once every caller has gone, cancel it to free its connection and rate limit slot
+    _in_flight_waiters[task] = _in_flight_waiters.get(task, 0) + 1
+    try:
+        async with asyncio.timeout(None if deadline is None else deadline - time.monotonic()) as scope:
+            return await asyncio.shield(task)
+    except TimeoutError as e:
+        if not scope.expired():
+            raise
+        raise DeadlineExceeded(f"{method} {path} did not finish within the call's deadline") from e
+    finally:
+        _in_flight_waiters[task] -= 1
+        if not _in_flight_waiters[task]:
+            del _in_flight_waiters[task]
+            if not task.done():
+                task.cancel()
+
+# ---- SERVER LIFECYCLE ----
+# stdio serves a single agent session per process. The network transports
+# (streamable HTTP and SSE) let one long-running process serve many clients,
+# sharing its connection pools, caches and rate limit budgets.
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "stdio")  # stdio, streamable-http or sse
+MCP_HOST = os.getenv("MCP_HOST", "127.0.0.1")
+MCP_PORT = int(os.getenv("MCP_PORT", "8000"))
+MCP_CLIENT_CONCURRENCY = int(os.getenv("MCP_CLIENT_CONCURRENCY", "8"))  # tool calls in flight per client session
+MCP_MAX_CONNECTIONS = int(os.getenv("MCP_MAX_CONNECTIONS", "0"))  # open HTTP connections before 503s; 0 = unlimited
+MCP_SHUTDOWN_TIMEOUT = float(os.getenv("MCP_SHUTDOWN_TIMEOUT", "30"))  # seconds to drain in-flight requests
+# Host headers accepted besides the loopback names, e.g. "mcp.example.com,10.0.0.5:*";
+# "*" turns off DNS rebinding protection entirely
+MCP_ALLOWED_HOSTS = [host.strip() for host in os.getenv("MCP_ALLOWED_HOSTS", "").split(",") if host.strip()]
+
+_lifespan_users = 0
+_metrics_dump_task: asyncio.Task | None = None
+_prefetch_task: asyncio.Task | None = None
+
+@asynccontextmanager
+async def app_lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Open the shared resources with the first user and close them when the last one leaves.
+
+    The MCP server enters the lifespan once per session, so under the network
+    transports it runs for every client; run_server() holds an extra reference
+    for the lifetime of the process.
+    """
+    global _lifespan_users, _metrics_dump_task, _prefetch_task
+    if _lifespan_users == 0:
+        if not MCP_FAST_START:
+            for base_url in UPSTREAM_HEADERS:
+                get_http_client(base_url)
+        if METRICS_FILE:
+            _metrics_dump_task = asyncio.create_task(dump_metrics_periodically())
+        if PREFETCH_ENABLED:
+            _prefetch_task = asyncio.create_task(prefetch_periodically())
+    _lifespan_users += 1
+    try:
+        yield
+    finally:
+        _lifespan_users -= 1
+        if _lifespan_users == 0:
+            if _prefetch_task is not None:
+                _prefetch_task.cancel()
+                _prefetch_task = None
+            if _metrics_dump_task is not None:
+                _metrics_dump_task.cancel()
+                _metrics_dump_task = None
+                try:
+                    write_metrics_file()
+                except OSError as e:
+                    logger.error("Error writing metrics file: %s", e)
+            await cancel_revalidations()
+            await close_http_clients()
+            if disk_cache is not None:
+                disk_cache.close()
+            if entity_store is not None and entity_store.path != ":memory:":
+                await entity_store.flush()
+                entity_store.close()
+            if watchlist.path != ":memory:":
+                watchlist.close()
+
+class SocialWebScraperMCP(FastMCP):
+    """FastMCP server that bounds the number of concurrent tool calls per client session and honours MCP_FAST_START."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.client_concurrency = 0  # 0 = unbounded; set by run_server() for the network transports
+        self._client_slots: weakref.WeakKeyDictionary[Any, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+
+    def tool(self, *args: Any, **kwargs: Any) -> Callable:
+        if MCP_FAST_START:
+            # Tools return JSON text either way; skipping the output schema halves per-tool model building
+            kwargs.setdefault("structured_output", False)
+        return super().tool(*args, **kwargs)
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]) -> Any:
+        if not self.client_concurrency:
+            return await super().call_tool(name, arguments)
+        session = self._mcp_server.request_context.session
+        slots = self._client_slots.get(session)
+        if slots is None:
+            slots = self._client_slots[session] = asyncio.Semaphore(self.client_concurrency)
+        async with slots:
+            return await super().call_tool(name, arguments)
 
 # Initialize MCP
-mcp = FastMCP("social_web_scraper")
+mcp = SocialWebScraperMCP("social_web_scraper", lifespan=app_lifespan)
 
 # ---- RESPONSE SIZE CONFIGURATION ----
 RESPONSE_LIMITS = {
@@ -40,44 +1089,94 @@ RESPONSE_LIMITS = {
     "instagram_profile": 4000,
     "max_posts_returned": 5,
     "max_comments_returned": 10,
-    "max_search_results": 8
+    "max_search_results": 8,
+    "batch_item": 1500,
+    "linkedin_company": 5000,
+    "linkedin_post": 4000,
+    "linkedin_activity": 4000,
+    "linkedin_reactions": 4000,
+    "linkedin_company_search": 4000,
+    "linkedin_jobs": 5000,
+    "linkedin_job": 5000,
+    "max_items_returned": 10
 }
 
 # ---- DATA FILTERING UTILITIES ----
-def limit_response_size(data: dict, max_chars: int = 8000) -> dict:
-    """Limit response size by removing large fields and truncating content."""
-    if not data:
-        return data
-    
-    # Create a copy to avoid modifying original
-    filtered_data = {}
-    current_size = 0
-    
+_SKIPPED_KEY_PARTS = ('image', 'photo', 'avatar', 'picture', 'media', 'url')
+# Tool responses are emitted with non-ASCII characters unescaped, so strings
+# are sized the same way
+_encode_json_string = json.encoder.encode_basestring
+
+def _scalar_json_size(value: Any) -> int:
+    """Exact length of a scalar's JSON encoding, as dump_json emits it."""
+    if isinstance(value, str):
+        return len(_encode_json_string(value))
+    if value is None or value is True:
+        return 4
+    if value is False:
+        return 5
+    if isinstance(value, int):
+        return len(int.__repr__(value))
+    if isinstance(value, float):
+        return len(float.__repr__(value))
+    return len(_encode_json_string(str(value)))
+
+def _compact_dict(data: dict, limit: int, max_items: int = 10) -> tuple[dict, int]:
+    compacted = {}
+    size = 2  # {}
     for key, value in data.items():
+        key = str(key)
+        lowered = key.lower()
         # Skip large image/media fields
-        if any(skip_key in key.lower() for skip_key in ['image', 'photo', 'avatar', 'picture', 'media', 'url']):
+        if any(part in lowered for part in _SKIPPED_KEY_PARTS):
             continue
-            
+        entry_size = len(_encode_json_string(key)) + 1 + (1 if compacted else 0)  # "key": and comma
+        result = _compact_value(value, limit, limit - size - entry_size, max_items)
+        if result is None:
+            break
+        compacted[key] = result[0]
+        size += entry_size + result[1]
+    return compacted, size
+
+def _compact_value(value: Any, limit: int, remaining: int, max_items: int = 10) -> tuple[Any, int] | None:
+    """Compact one value into at most `remaining` JSON bytes, or return None if it can't fit."""
+    if remaining < 2:
+        return None
+    if isinstance(value, dict):
+        # Nested objects get a quarter of their parent's budget
+        value, size = _compact_dict(value, min(limit // 4, remaining))
+    elif isinstance(value, list):
+        items = []
+        size = 2  # []
+        # Limit list sizes, dropping trailing items that no longer fit. Items are
+        # kept whole or not at all, so the list never ends in a half-emptied one
+        for item in value[:max_items]:
+            separator = 1 if items else 0
+            result = _compact_value(item, limit, limit)
+            if result is None or size + separator + result[1] > remaining:
+                break
+            items.append(result[0])
+            size += separator + result[1]
+        value = items
+    else:
         # Truncate long text fields
         if isinstance(value, str) and len(value) > 500:
             value = value[:500] + "..."
-            
-        # Limit list sizes
-        elif isinstance(value, list) and len(value) > 10:
-            value = value[:10]
-            
-        # Recursively filter nested objects
-        elif isinstance(value, dict):
-            value = limit_response_size(value, max_chars // 4)
-            
-        value_str = str(value)
-        if current_size + len(value_str) > max_chars:
-            break
-            
-        filtered_data[key] = value
-        current_size += len(value_str)
-    
-    return filtered_data
+        size = _scalar_json_size(value)
+    return (value, size) if size <= remaining else None
+
+def limit_response_size(data: dict, max_chars: int = 8000, max_items: int = 10) -> dict:
+    """Limit response size by removing large fields and truncating content.
+
+    Walks the payload once, tracking the exact size of its compact JSON
+    encoding, and stops as soon as max_chars is reached. Media/URL keys are
+    dropped, strings are cut to 500 characters, top-level lists to max_items
+    items and nested lists to 10, and nested objects to a quarter of their
+    parent's budget.
+    """
+    if not data:
+        return data
+    return _compact_dict(data, max_chars, max_items)[0]
 
 def extract_linkedin_profile_essentials(data: dict) -> dict:
     """Extract essential LinkedIn profile data for analytics."""
@@ -185,7 +1284,7 @@ def extract_posts_essentials(data: dict, max_posts: int = 5) -> dict:
             break
     
     if not posts_key:
-        return limit_response_size(data, max_chars=4000)
+        return data  # no post list: the caller's size limit applies to the whole payload
     
     posts = data[posts_key][:max_posts]  # Limit to max_posts
     
@@ -212,590 +1311,2177 @@ def extract_posts_essentials(data: dict, max_posts: int = 5) -> dict:
             
             filtered_posts.append(post_essentials)
     
-    essentials[posts_key] = filtered_posts
+    # Counts go first so the size limit never drops them
     essentials['total_posts_available'] = len(data.get(posts_key, []))
     essentials['posts_returned'] = len(filtered_posts)
+    essentials[posts_key] = filtered_posts
     
     return essentials
 
-# ---- LINKEDIN PERSONAL PROFILE TOOL ----
-async def fetch_personal_profile(linkedin_url: str) -> dict[str, Any] | None:
-    # Extract username from LinkedIn URL (e.g., "razane-boustany" from "https://www.linkedin.com/in/razane-boustany/")
-    if "/in/" in linkedin_url:
-        username = linkedin_url.split("/in/")[1].rstrip("/")
-    else:
-        username = linkedin_url  # assume it's already a username
-    params = {"username": username}
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": LINKEDIN_HOST
-    }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{LINKEDIN_API_BASE}/profile/detail",
-                headers=headers,
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching LinkedIn personal profile: {e}")
-            return None
+# ---- RESPONSE CACHE ----
+# Seconds each endpoint family stays fresh. Profiles change slowly, search
+# results change fast.
+CACHE_TTLS = {
+    "profile": 6 * 3600,
+    "posts": 30 * 60,
+    "activity": 30 * 60,
+    "engagement": 10 * 60,
+    "jobs": 3600,
+    "search": 5 * 60,
+}
+# Stale-while-revalidate: once past its TTL, an entry of these families is
+# still served for this many extra seconds while a background refresh runs;
+# only after that does a lookup wait on the upstream again.
+CACHE_STALE_TTL = float(os.getenv("CACHE_STALE_TTL", str(24 * 3600)))
+CACHE_STALE_TTLS = {
+    "profile": CACHE_STALE_TTL,
+}
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() != "false"
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "512"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
 
-@mcp.tool()
-async def get_personal_profile(linkedin_url: str) -> str:
-    """Fetch essential LinkedIn personal profile analytics data for a given URL."""
-    data = await fetch_personal_profile(linkedin_url)
-    if not data:
-        return "Unable to fetch LinkedIn personal profile data."
-    
-    # Filter and limit response size for analytics focus
-    filtered_data = extract_linkedin_profile_essentials(data)
-    limited_data = limit_response_size(filtered_data, max_chars=RESPONSE_LIMITS["linkedin_profile"])
-    
-    return json.dumps(limited_data, indent=2)
-
-# ---- LINKEDIN COMPANY PROFILE TOOL ----
-async def fetch_company_profile(linkedin_url: str) -> dict[str, Any] | None:
-    # The /companies/detail endpoint accepts company name, LinkedIn URL, or URN
-    params = {"identifier": linkedin_url}
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": LINKEDIN_HOST
-    }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{LINKEDIN_API_BASE}/companies/detail",
-                headers=headers,
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching LinkedIn company profile: {e}")
-            return None
+class ResponseCache:
+    """In-memory TTL cache with LRU eviction, bounded by entry count and JSON size."""
 
-@mcp.tool()
-async def get_company_profile(linkedin_url: str) -> str:
-    """Fetch full LinkedIn company page data for a given URL."""
-    data = await fetch_company_profile(linkedin_url)
-    if not data:
-        return "Unable to fetch LinkedIn company profile data."
-    return json.dumps(data, indent=2)
-
-# ---- LINKEDIN PROFILE POSTS TOOL ----
-async def fetch_profile_posts(linkedin_url: str) -> dict[str, Any] | None:
-    # Extract username from LinkedIn URL
-    if "/in/" in linkedin_url:
-        username = linkedin_url.split("/in/")[1].rstrip("/")
-    else:
-        username = linkedin_url
-    params = {"username": username}
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": LINKEDIN_HOST
-    }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{LINKEDIN_API_BASE}/profile/posts",
-                headers=headers,
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching LinkedIn profile posts: {e}")
-            return None
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[float, float, int, str, Any]] = OrderedDict()
+        self.total_bytes = 0
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        self.family_stats: dict[str, dict[str, int]] = {}
 
-@mcp.tool()
-async def get_profile_posts(linkedin_url: str) -> str:
-    """Get recent posts analytics data for a LinkedIn user by their URL or username."""
-    data = await fetch_profile_posts(linkedin_url)
-    if not data:
-        return "Unable to fetch LinkedIn profile posts data."
-    
-    # Filter and limit response size for analytics focus
-    filtered_data = extract_posts_essentials(data, max_posts=RESPONSE_LIMITS["max_posts_returned"])
-    limited_data = limit_response_size(filtered_data, max_chars=RESPONSE_LIMITS["linkedin_posts"])
-    
-    return json.dumps(limited_data, indent=2)
+    def _count(self, family: str, outcome: str) -> None:
+        self.stats[outcome] += 1
+        family_stats = self.family_stats.setdefault(family, {"hits": 0, "misses": 0})
+        family_stats[outcome] += 1
 
-# ---- LINKEDIN PROFILE COMMENTS TOOL ----
-async def fetch_profile_comments(linkedin_url: str) -> dict[str, Any] | None:
-    # Extract username from LinkedIn URL
-    if "/in/" in linkedin_url:
-        username = linkedin_url.split("/in/")[1].rstrip("/")
-    else:
-        username = linkedin_url
-    params = {"username": username}
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": LINKEDIN_HOST
-    }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{LINKEDIN_API_BASE}/profile/comments",
-                headers=headers,
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching LinkedIn profile comments: {e}")
+    def _discard(self, key: str) -> None:
+        _, _, size, _, _ = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def get(self, key: str, family: str) -> tuple[Any, bool] | None:
+        """Return (value, stale) for a live entry, or None; stale entries are past their TTL but within their stale window."""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= now:
+            self._discard(key)
+            self.stats["expirations"] += 1
+            entry = None
+        if entry is None:
+            self._count(family, "misses")
             return None
+        self._entries.move_to_end(key)
+        self._count(family, "hits")
+        stale = entry[1] <= now
+        if stale:
+            self.stats["stale_hits"] += 1
+        return entry[4], stale
 
-@mcp.tool()
-async def get_profile_comments(linkedin_url: str) -> str:
-    """Get recent comments of a LinkedIn user by their URL or username."""
-    data = await fetch_profile_comments(linkedin_url)
-    if not data:
-        return "Unable to fetch LinkedIn profile comments data."
-    return json.dumps(data, indent=2)
-
-# ---- LINKEDIN PROFILE REACTIONS TOOL ----
-async def fetch_profile_reactions(linkedin_url: str) -> dict[str, Any] | None:
-    # Extract username from LinkedIn URL
-    if "/in/" in linkedin_url:
-        username = linkedin_url.split("/in/")[1].rstrip("/")
-    else:
-        username = linkedin_url
-    params = {"username": username}
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": LINKEDIN_HOST
-    }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{LINKEDIN_API_BASE}/profile/reactions",
-                headers=headers,
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching LinkedIn profile reactions: {e}")
+    def fresh_for(self, key: str) -> float | None:
+        """Seconds until a cached entry goes stale (negative once it has), or None if it isn't cached."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
             return None
+        return entry[1] - time.monotonic()
 
-@mcp.tool()
-async def get_profile_reactions(linkedin_url: str) -> str:
-    """Get recent reactions of a LinkedIn user by their URL or username."""
-    data = await fetch_profile_reactions(linkedin_url)
-    if not data:
-        return "Unable to fetch LinkedIn profile reactions data."
-    return json.dumps(data, indent=2)
+    def set(self, key: str, family: str, value: Any, ttl: float, stale_ttl: float = 0.0) -> None:
+        """Store value as fresh for ttl seconds, then servable as stale for stale_ttl more."""
+        size = len(json_dumps_bytes(value))
+        if ttl + stale_ttl <= 0 or size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._discard(key)
+        now = time.monotonic()
+        self._entries[key] = (now + ttl + stale_ttl, now + ttl, size, family, value)
+        self.total_bytes += size
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+            self.stats["evictions"] += 1
 
-# ---- FACEBOOK PROFILE TOOL ----
-async def fetch_facebook_profile(profile_url: str) -> dict[str, Any] | None:
-    params = {"url": profile_url}
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": FACEBOOK_HOST
-    }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{FACEBOOK_API_BASE}/profile/details_url",
-                headers=headers,
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching Facebook profile: {e}")
-            return None
+    def clear(self) -> None:
+        self._entries.clear()
+        self.total_bytes = 0
 
-@mcp.tool()
-async def get_facebook_profile(profile_url: str) -> str:
-    """Fetch essential Facebook profile analytics data for a given public URL."""
-    data = await fetch_facebook_profile(profile_url)
-    if not data:
-        return "Unable to fetch Facebook profile data."
-    
-    # Filter and limit response size for analytics focus
-    filtered_data = extract_facebook_profile_essentials(data)
-    limited_data = limit_response_size(filtered_data, max_chars=RESPONSE_LIMITS["facebook_profile"])
-    
-    return json.dumps(limited_data, indent=2)
+    def snapshot(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "families": self.family_stats,
+        }
 
-# ---- INSTAGRAM PROFILE TOOL ----
-async def fetch_instagram_profile(instagram_url_or_username: str) -> dict[str, Any] | None:
-    params = {"username_or_url": instagram_url_or_username}
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": INSTAGRAM_HOST
-    }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{INSTAGRAM_API_BASE}/ig_get_fb_profile_hover.php",
-                headers=headers,
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching Instagram profile: {e}")
-            return None
+response_cache = ResponseCache(CACHE_MAX_ENTRIES, CACHE_MAX_BYTES)
 
-@mcp.tool()
-async def get_instagram_profile(instagram_url_or_username: str) -> str:
-    """Fetch essential Instagram profile analytics data for a given public username or URL."""
-    data = await fetch_instagram_profile(instagram_url_or_username)
-    if not data:
-        return "Unable to fetch Instagram profile data."
-    
-    # Filter and limit response size for analytics focus
-    filtered_data = extract_instagram_profile_essentials(data)
-    limited_data = limit_response_size(filtered_data, max_chars=RESPONSE_LIMITS["instagram_profile"])
-    
-    return json.dumps(limited_data, indent=2)
-
-# ---- LINKEDIN POST COMMENTS TOOL ----
-async def fetch_post_comments(post_url: str) -> dict[str, Any] | None:
-    params = {"post_url": post_url}
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": LINKEDIN_HOST
-    }
-    async with httpx.AsyncClient() as client:
+# ---- PERSISTENT CACHE TIER ----
+# Optional SQLite store behind the in-memory cache, so a restarted server
+# (stdio clients spawn one per conversation) starts warm. Disabled unless
+# CACHE_DB_PATH is set.
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "")
+CACHE_DB_MAX_BYTES = int(os.getenv("CACHE_DB_MAX_BYTES", str(256 * 1024 * 1024)))
+
+class DiskCache:
+    """SQLite-backed response store with zlib-compressed blobs and a per-family expiry index.
+
+    WAL mode plus a busy timeout lets several server processes on the same
+    host share one file. Calls run in a worker thread so the event loop never
+    waits on disk I/O.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    family TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    body BLOB NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS responses_expiry ON responses (family, expires_at);
+                CREATE INDEX IF NOT EXISTS responses_access ON responses (accessed_at);
+            """)
+            conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+            self._conn = conn
+        return self._conn
+
+    def _get(self, key: str) -> tuple[Any, float] | None:
+        with self._lock:
+            conn = self._connect()
+            now = time.time()
+            row = conn.execute(
+                "SELECT body, expires_at FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return json_loads(zlib.decompress(row[0])), row[1]
+
+    def _set(self, key: str, family: str, value: Any, ttl: float) -> None:
+        body = zlib.compress(json_dumps_bytes(value), 6)
+        if len(body) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, family, expires_at, accessed_at, size, body) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, family, now + ttl, now, len(body), body)
+                )
+                self.stats["evictions"] += self._evict(conn, now)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> int:
+        """Drop expired rows, then least recently used rows until the store fits max_bytes."""
+        evicted = conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return evicted
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            evicted += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+        return evicted
+
+    async def get(self, key: str) -> tuple[Any, float] | None:
+        """Return (value, wall-clock expiry) for a live entry, or None."""
         try:
-            response = await client.get(
-                f"{LINKEDIN_API_BASE}/post/comments",
-                headers=headers,
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching LinkedIn post comments: {e}")
+            hit = await asyncio.to_thread(self._get, key)
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            self.stats["errors"] += 1
+            logger.error("Error reading persistent cache: %s", e)
             return None
+        self.stats["hits" if hit is not None else "misses"] += 1
+        return hit
 
-@mcp.tool()
-async def get_post_comments(post_url: str) -> str:
-    """Get essential comments and engagement analytics from LinkedIn posts."""
-    data = await fetch_post_comments(post_url)
-    if not data:
-        return "Unable to fetch LinkedIn post comments data."
-    
-    # Filter and limit response size for analytics focus
-    filtered_data = extract_posts_essentials(data, max_posts=RESPONSE_LIMITS["max_comments_returned"])
-    limited_data = limit_response_size(filtered_data, max_chars=RESPONSE_LIMITS["linkedin_comments"])
-    
-    return json.dumps(limited_data, indent=2)
-
-# ---- LINKEDIN POST DETAILS TOOL ----
-async def fetch_post_details(post_url: str) -> dict[str, Any] | None:
-    params = {"post_url": post_url}
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": LINKEDIN_HOST
-    }
-    async with httpx.AsyncClient() as client:
+    async def set(self, key: str, family: str, value: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
         try:
-            response = await client.get(
-                f"{LINKEDIN_API_BASE}/post/detail",
-                headers=headers,
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching LinkedIn post details: {e}")
-            return None
+            await asyncio.to_thread(self._set, key, family, value, ttl)
+            self.stats["writes"] += 1
+        except sqlite3.Error as e:
+            self.stats["errors"] += 1
+            logger.error("Error writing persistent cache: %s", e)
 
-@mcp.tool()
-async def get_post_details(post_url: str) -> str:
-    """Get detailed post and author information for a given LinkedIn post."""
-    data = await fetch_post_details(post_url)
-    if not data:
-        return "Unable to fetch LinkedIn post details data."
-    return json.dumps(data, indent=2)
-
-# ---- LINKEDIN POST REACTIONS TOOL ----
-async def fetch_post_reactions(post_url: str) -> dict[str, Any] | None:
-    params = {"post_url": post_url}
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": LINKEDIN_HOST
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "path": self.path, "max_bytes": self.max_bytes}
+
+disk_cache = DiskCache(CACHE_DB_PATH, CACHE_DB_MAX_BYTES) if CACHE_DB_PATH else None
+
+def cache_key(endpoint: str, params: dict) -> str:
+    """Build a cache key from an endpoint name and its normalized parameters."""
+    normalized = {
+        name: value.strip() if isinstance(value, str) else value
+        for name, value in params.items()
     }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{LINKEDIN_API_BASE}/post/reactions",
-                headers=headers,
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching LinkedIn post reactions: {e}")
+    return endpoint + ":" + json.dumps(normalized, sort_keys=True, default=str)
+
+async def store_in_cache(key: str, family: str, data: Any) -> None:
+    stale_ttl = CACHE_STALE_TTLS.get(family, 0.0)
+    response_cache.set(key, family, data, CACHE_TTLS[family], stale_ttl)
+    if disk_cache is not None:
+        # The disk tier only keeps the hard expiry; the stale window is re-derived on read
+        await disk_cache.set(key, family, data, CACHE_TTLS[family] + stale_ttl)
+
+async def read_through_cache(key: str, family: str | None, fetch, refresh: bool = False) -> Any:
+    """Serve a fetch from the memory and disk tiers; failed (empty) fetches are never stored.
+
+    Stale entries are returned immediately and refreshed in the background.
+    refresh=True always fetches and replaces the cached entry.
+    """
+    if family is None or not CACHE_ENABLED:
+        return await fetch()
+    hit = None if refresh else response_cache.get(key, family)
+    if hit is None and disk_cache is not None and not refresh:
+        disk_hit = await disk_cache.get(key)
+        if disk_hit is not None:
+            data, expires_at = disk_hit
+            stale_ttl = CACHE_STALE_TTLS.get(family, 0.0)
+            fresh_for = expires_at - stale_ttl - time.time()
+            response_cache.set(key, family, data, fresh_for, stale_ttl)
+            hit = data, fresh_for <= 0
+    if hit is not None:
+        data, stale = hit
+        if stale:
+            revalidate_in_background(key, family, fetch)
+        return data
+    data = await fetch()
+    if data:
+        await store_in_cache(key, family, data)
+    return data
+
+# ---- STALE-WHILE-REVALIDATE ----
+# One background refresh per stale key. Refreshes run at bulk priority, so
+# they queue behind interactive calls on the same host and give up rather
+# than wait past RATE_LIMIT_MAX_WAIT; on failure the stale entry stays put.
+_revalidating: dict[str, asyncio.Task] = {}
+revalidation_stats = {"started": 0, "refreshed": 0, "failed": 0, "deduplicated": 0}
+
+async def _revalidate(key: str, family: str, fetch) -> None:
+    tokens = (
+        (request_priority, request_priority.set(PRIORITY_BULK)),
+        (request_deadline, request_deadline.set(None)),  # not bound by the tool call that found it stale
+    )
+    try:
+        data = await fetch()
+        if data:
+            await store_in_cache(key, family, data)
+            revalidation_stats["refreshed"] += 1
+        else:
+            revalidation_stats["failed"] += 1
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+def revalidate_in_background(key: str, family: str, fetch) -> None:
+    if key in _revalidating:
+        revalidation_stats["deduplicated"] += 1
+        return
+    revalidation_stats["started"] += 1
+    task = asyncio.create_task(_revalidate(key, family, fetch))
+    _revalidating[key] = task
+    task.add_done_callback(lambda _: _revalidating.pop(key, None))
+
+async def cancel_revalidations() -> None:
+    tasks = list(_revalidating.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+# ---- PAGINATION ----
+# Paginated endpoints take an opaque cursor: "token:<pagination_token>" when the
+# provider returns a continuation token, "page:<n>" otherwise. A "#<k>" suffix
+# skips the first k items of that page, so a tool that stops mid-page can hand
+# back a cursor that resumes exactly where it left off.
+PAGINATION_MAX_PAGES = int(os.getenv("PAGINATION_MAX_PAGES", "10"))
+PAGINATION_MAX_ITEMS = int(os.getenv("PAGINATION_MAX_ITEMS", "500"))
+# Tools that return the items themselves get this many characters per item,
+# up to PAGINATION_MAX_CHARS per response; max_items is clamped to what that
+# budget holds so pages that could never be emitted aren't fetched
+PAGINATION_ITEM_CHARS = int(os.getenv("PAGINATION_ITEM_CHARS", "400"))
+PAGINATION_MAX_CHARS = int(os.getenv("PAGINATION_MAX_CHARS", "20000"))
+PAGINATION_TOKEN_KEYS = ("pagination_token", "paginationToken", "next_page_token", "next_cursor", "cursor")
+ITEM_LIST_KEYS = ("posts", "data", "results", "items", "comments", "reactions", "reposts", "jobs", "companies")
+
+def cursor_params(cursor: str) -> dict:
+    """Translate a page cursor (without skip suffix) into request parameters."""
+    kind, _, value = cursor.partition(":")
+    if not cursor or (kind == "page" and value == "1"):
+        return {}
+    if kind == "page" and value.isdigit():
+        return {"page": value}
+    return {"pagination_token": value if kind == "token" else cursor}
+
+def find_item_list(data: dict) -> tuple[str, ...] | None:
+    """Locate the item list of a page, at the top level or inside a 'data' object."""
+    for path in ((), ("data",)):
+        container = data.get(path[0]) if path else data
+        if isinstance(container, dict):
+            for key in ITEM_LIST_KEYS:
+                if isinstance(container.get(key), list):
+                    return path + (key,)
+    return None
+
+def page_items(data: dict) -> list:
+    path = find_item_list(data)
+    if path is None:
+        return []
+    return data[path[0]] if len(path) == 1 else data[path[0]][path[1]]
+
+def with_items(data: dict, items: list) -> dict:
+    """Return a shallow copy of a page with its item list replaced and its provider token dropped.
+
+    Pages may be shared with the response cache, so they are never modified in place.
+    """
+    path = find_item_list(data)
+    if path is None:
+        return data
+    container = {key: value for key, value in (data[path[0]] if len(path) == 2 else data).items() if key not in PAGINATION_TOKEN_KEYS}
+    container[path[-1]] = items
+    return {**data, path[0]: container} if len(path) == 2 else container
+
+def next_page_cursor(data: dict, cursor: str, items: list) -> str | None:
+    for container in (data, data.get("data")):
+        if isinstance(container, dict):
+            for key in PAGINATION_TOKEN_KEYS:
+                token = container.get(key)
+                if token and isinstance(token, str):
+                    return f"token:{token}"
+            if container.get("has_more") is False or container.get("hasMore") is False:
+                return None
+    if not items:
+        return None
+    kind, _, value = cursor.partition(":")
+    page = int(value) if kind == "page" and value.isdigit() else 1
+    return f"page:{page + 1}"
+
+@dataclass
+class Page:
+    data: dict
+    items: list
+    cursor: str
+    next_cursor: str | None
+
+async def paginate(fetch_page, cursor: str = "", max_items: int = PAGINATION_MAX_ITEMS, max_pages: int = PAGINATION_MAX_PAGES) -> AsyncIterator[Page]:
+    """Lazily yield pages from fetch_page(cursor), prefetching the next page while the caller consumes the current one.
+
+    Stops after max_items items or max_pages upstream calls, when the provider
+    signals the end, or when a page repeats the previous one (providers that
+    ignore the page parameter).
+    """
+    cursor, _, skip = cursor.partition("#")
+    skip = int(skip) if skip.isdigit() else 0
+    pending = asyncio.create_task(fetch_page(cursor))
+    seen = pages = 0
+    previous_first = None
+    try:
+        while pending is not None:
+            data = await pending
+            pending = None
+            if not data:
+                return
+            items = page_items(data)
+            pages += 1
+            if items and previous_first is not None and items[0] == previous_first:
+                yield Page(data, [], cursor, None)
+                return
+            previous_first = items[0] if items else None
+            next_cursor = next_page_cursor(data, cursor, items)
+            items = items[skip:]
+            skip = 0
+            seen += len(items)
+            if next_cursor and seen < max_items and pages < max_pages:
+                pending = asyncio.create_task(fetch_page(next_cursor))
+            yield Page(data, items, cursor, next_cursor)
+            cursor = next_cursor
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+async def collect_pages(fetch_page, cursor: str = "", max_items: int = PAGINATION_MAX_ITEMS) -> tuple[dict | None, list[str | None]]:
+    """Gather up to max_items items across pages into one page-shaped dict plus the cursors to resume from.
+
+    cursors[i] resumes at the i-th collected item and cursors[-1] after the
+    last one, so a caller that emits fewer items than it collected can still
+    hand back an exact cursor.
+    """
+    max_items = max(1, min(max_items, PAGINATION_MAX_ITEMS))
+    first = None
+    items: list = []
+    cursors: list[str | None] = []
+    next_cursor = None
+    async with aclosing(paginate(fetch_page, cursor, max_items)) as pages:
+        async for page in pages:
+            first = first or page.data
+            room = max_items - len(items)
+            items.extend(page.items[:room])
+            skipped = len(page_items(page.data)) - len(page.items)
+            page_cursor = page.cursor or "page:1"
+            cursors.extend(f"{page_cursor}#{skipped + i}" if skipped + i else page_cursor for i in range(min(room, len(page.items))))
+            next_cursor = page.next_cursor
+            if len(page.items) > room:
+                next_cursor = f"{page_cursor}#{skipped + room}"
+            if len(items) >= max_items:
+                break
+    if first is None:
+        return None, [None]
+    return with_items(first, items), cursors + [next_cursor]
+
+# ---- SCHEMA-DRIVEN EXTRACTORS ----
+# Each schema maps an output field to (candidate source paths, max string
+# length). The first path that yields a non-empty value wins; dotted paths
+# reach into nested objects. Link fields are renamed to "*_link" so the agent
+# keeps the identifier needed for follow-up calls (limit_response_size drops
+# keys containing "url").
+COMPANY_PROFILE_SCHEMA = {
+    "name": (("name", "company_name"), 200),
+    "tagline": (("tagline", "slogan"), 300),
+    "description": (("description", "about"), 600),
+    "industry": (("industry", "industries"), 200),
+    "company_type": (("type", "company_type"), 100),
+    "headquarters": (("headquarters", "headquarter", "location"), 200),
+    "employee_count": (("employee_count", "staff_count", "employees_count", "company_size", "staff_count_range"), None),
+    "followers": (("followers", "follower_count", "followers_count"), None),
+    "founded": (("founded", "founded_on", "founded_year"), None),
+    "specialities": (("specialities", "specialties"), None),
+    "website": (("website", "website_url"), 200),
+}
+POST_DETAILS_SCHEMA = {
+    "text": (("text", "content", "commentary", "description"), 1000),
+    "posted_at": (("posted_at", "date", "created_at", "timestamp", "posted_date"), None),
+    "likes": (("likes", "num_likes", "like_count", "stats.likes", "stats.total_reactions"), None),
+    "comments": (("comments", "num_comments", "comment_count", "stats.comments"), None),
+    "reposts": (("reposts", "shares", "num_reposts", "num_shares", "repost_count", "stats.reposts"), None),
+    "reactions": (("reactions", "reaction_counts", "stats.reactions"), None),
+    "author_name": (("author.name", "author.full_name", "author_name"), 200),
+    "author_headline": (("author.headline", "author.title", "author_headline"), 200),
+    "author_link": (("author.url", "author.profile_url", "author.linkedin_url"), 300),
+}
+JOB_DETAILS_SCHEMA = {
+    "title": (("title", "job_title"), 200),
+    "company": (("company.name", "company_name", "company"), 200),
+    "location": (("location", "formatted_location"), 200),
+    "workplace_type": (("workplace_type", "remote", "work_remote_allowed"), None),
+    "employment_type": (("employment_type", "job_type"), 100),
+    "seniority_level": (("seniority_level", "experience_level"), 100),
+    "salary": (("salary", "salary_range", "compensation"), 200),
+    "posted_at": (("posted_at", "listed_at", "date", "posted_date"), None),
+    "applicants": (("applicants", "applicant_count", "applies"), None),
+    "description": (("description", "job_description"), 1200),
+}
+PROFILE_COMMENT_ITEM_SCHEMA = {
+    "text": (("text", "comment", "content", "commentary"), 300),
+    "created_at": (("created_at", "date", "posted_at", "timestamp"), None),
+    "likes": (("likes", "num_likes", "reactions_count", "stats.likes"), None),
+    "post_text": (("post.text", "post.content", "post_text"), 200),
+    "post_author": (("post.author.name", "post_author"), 100),
+    "post_link": (("post.url", "post_url", "url"), 300),
+}
+POST_COMMENT_ITEM_SCHEMA = {
+    "text": (("text", "comment", "content", "commentary"), 300),
+    "author_name": (("author.name", "author.full_name", "commenter.name", "name"), 100),
+    "author_headline": (("author.headline", "author.title", "commenter.headline", "headline"), 150),
+    "created_at": (("created_at", "date", "posted_at", "timestamp"), None),
+    "likes": (("likes", "num_likes", "reactions_count", "stats.likes", "stats.total_reactions"), None),
+    "replies": (("replies_count", "num_replies", "comments_count", "stats.comments"), None),
+    "author_link": (("author.url", "author.profile_url", "commenter.url"), 300),
+}
+REACTION_ITEM_SCHEMA = {
+    "reaction_type": (("reaction_type", "reaction", "type"), None),
+    "name": (("name", "full_name", "reactor.name", "actor.name"), 100),
+    "headline": (("headline", "reactor.headline", "actor.headline"), 150),
+    "post_text": (("post.text", "post.content", "text"), 200),
+    "post_author": (("post.author.name", "author.name"), 100),
+    "post_link": (("post.url", "post_url"), 300),
+}
+REPOST_ITEM_SCHEMA = {
+    "name": (("name", "author.name", "reposter.name", "actor.name"), 100),
+    "headline": (("headline", "author.headline", "reposter.headline"), 150),
+    "text": (("text", "commentary", "content"), 300),
+    "reposted_at": (("reposted_at", "date", "created_at", "posted_at"), None),
+}
+COMPANY_SEARCH_ITEM_SCHEMA = {
+    "name": (("name", "company_name", "title"), 150),
+    "industry": (("industry", "industries", "subtitle"), 150),
+    "location": (("location", "headquarters"), 150),
+    "followers": (("followers", "follower_count", "followers_count"), None),
+    "description": (("description", "summary", "tagline"), 200),
+    "company_link": (("url", "linkedin_url", "company_url"), 300),
+}
+JOB_SEARCH_ITEM_SCHEMA = {
+    "title": (("title", "job_title"), 150),
+    "company": (("company.name", "company_name", "company"), 150),
+    "location": (("location", "formatted_location"), 150),
+    "posted_at": (("posted_at", "listed_at", "date", "posted_date"), None),
+    "job_link": (("url", "job_url", "link"), 300),
+}
+
+def get_path(data: Any, path: str) -> Any:
+    """Follow a dotted path through nested dicts, returning None if any step is missing."""
+    for part in path.split("."):
+        if not isinstance(data, dict):
             return None
+        data = data.get(part)
+    return data
 
-@mcp.tool()
-async def get_post_reactions(post_url: str) -> str:
-    """Get reactions data for a given LinkedIn post."""
-    data = await fetch_post_reactions(post_url)
+def unwrap_envelope(data: dict) -> dict:
+    """Return the payload inside a {"success": ..., "data": {...}} style envelope."""
+    inner = data.get("data")
+    return inner if isinstance(inner, dict) else data
+
+def extract_with_schema(data: dict, schema: dict) -> dict:
+    """Extract the fields described by a schema from one upstream object."""
     if not data:
-        return "Unable to fetch LinkedIn post reactions data."
-    return json.dumps(data, indent=2)
-
-# ---- LINKEDIN POST REPOSTS TOOL ----
-async def fetch_post_reposts(post_url: str) -> dict[str, Any] | None:
-    params = {"post_url": post_url}
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": LINKEDIN_HOST
-    }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{LINKEDIN_API_BASE}/post/reposts",
-                headers=headers,
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching LinkedIn post reposts: {e}")
-            return None
+        return {}
+    essentials = {}
+    for field, (paths, max_len) in schema.items():
+        for path in paths:
+            value = get_path(data, path)
+            if value not in (None, "", [], {}):
+                if isinstance(value, str) and max_len and len(value) > max_len:
+                    value = value[:max_len] + "..."
+                essentials[field] = value
+                break
+    return essentials
 
-@mcp.tool()
-async def get_post_reposts(post_url: str) -> str:
-    """Get repost data for a given LinkedIn post."""
-    data = await fetch_post_reposts(post_url)
+def extract_items_with_schema(data: dict, item_schema: dict, items_name: str, max_items: int) -> dict:
+    """Extract schema fields from each item of a list response, keeping at most max_items."""
     if not data:
-        return "Unable to fetch LinkedIn post reposts data."
-    return json.dumps(data, indent=2)
-
-# ---- LINKEDIN POSTS SEARCH TOOL ----
-async def fetch_posts_search(keyword: str) -> dict[str, Any] | None:
-    params = {"keyword": keyword}
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": LINKEDIN_HOST
+        return {}
+    if find_item_list(data) is None:
+        return data  # no item list: the caller's size limit applies to the whole payload
+    items = page_items(data)
+    extracted = [extract_with_schema(item, item_schema) for item in items[:max_items] if isinstance(item, dict)]
+    # Counts go first so the size limit never drops them
+    return {
+        f"total_{items_name}_available": len(items),
+        f"{items_name}_returned": len(extracted),
+        items_name: extracted,
     }
-    async with httpx.AsyncClient() as client:
+
+def extract_reactions_essentials(data: dict, max_items: int) -> dict:
+    """Extract reaction items plus a count per reaction type over every collected reaction."""
+    essentials = extract_items_with_schema(data, REACTION_ITEM_SCHEMA, "reactions", max_items)
+    if "reactions" in essentials:
+        counts: dict[str, int] = {}
+        for item in page_items(data):
+            if isinstance(item, dict):
+                kind = str(extract_with_schema(item, REACTION_ITEM_SCHEMA).get("reaction_type", "unknown"))
+                counts[kind] = counts.get(kind, 0) + 1
+        essentials = {"reaction_counts": counts, **essentials}
+    return essentials
+
+# ---- ENGAGEMENT ANALYTICS ----
+# analyze_engagement() reduces a full post set to summary statistics on the
+# server, so the agent gets trends over hundreds of posts instead of a five
+# post sample. Metrics are gathered into columns and summarized in one pass
+# per statistic, with NumPy when installed (imported on first use) and the
+# standard library otherwise.
+ANALYTICS_BACKEND = os.getenv("ANALYTICS_BACKEND", "auto")  # "auto", "numpy" or "python"
+analytics_backend = "numpy" if ANALYTICS_BACKEND in ("auto", "numpy") and importlib.util.find_spec("numpy") is not None else "python"
+ANALYTICS_MAX_POSTS = int(os.getenv("ANALYTICS_MAX_POSTS", "200"))
+ANALYTICS_PERCENTILES = (25, 50, 75, 90)
+ENGAGEMENT_SOURCES = {"profile": "profile_posts", "company": "company_posts", "search": "posts_search"}
+ENGAGEMENT_METRICS = ("likes", "comments", "reposts", "reactions", "engagement")
+ENGAGEMENT_POST_SCHEMA = {
+    "likes": (("likes", "num_likes", "like_count", "stats.likes", "stats.like"), None),
+    "comments": (("comments", "num_comments", "comment_count", "comments_count", "stats.comments"), None),
+    "reposts": (("reposts", "shares", "num_reposts", "num_shares", "repost_count", "stats.reposts", "stats.shares"), None),
+    "reactions": (("reactions", "reaction_counts", "num_reactions", "total_reactions", "stats.total_reactions", "stats.reactions"), None),
+    "posted_at": (("posted_at", "date", "created_at", "timestamp", "posted_date", "time"), None),
+    "text": (("text", "content", "commentary", "description"), 160),
+    "post_link": (("url", "post_url", "link"), 300),
+}
+# "3d", "5 mins ago", "2mo": the unit must end the value, so dates like "12 May 2024" fall through
+_RELATIVE_AGE = re.compile(
+    r"^(\d+)\s*(s|secs?|seconds?|m|mins?|minutes?|h|hrs?|hours?|d|days?|w|wks?|weeks?|mos?|months?|y|yrs?|years?)(?:\s+ago)?$",
+    re.IGNORECASE,
+)
+_DATE_FORMATS = ("%d %b %Y", "%d %B %Y", "%b %d, %Y", "%B %d, %Y")  # "12 May 2024", "May 12, 2024"
+# Keyed by the unit's first two letters for minutes and months, its first letter otherwise
+_RELATIVE_AGE_SECONDS = {"s": 1, "m": 60, "mi": 60, "h": 3600, "d": 86400, "w": 7 * 86400, "mo": 30 * 86400, "y": 365 * 86400}
+
+def as_count(value: Any) -> float | None:
+    """Read an engagement count: a number, a numeric string ("1,234"), a list of items or a dict of per-type counts."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        digits = value.replace(",", "").strip()
+        return float(digits) if digits.isdigit() else None
+    if isinstance(value, list):
+        return float(len(value))
+    if isinstance(value, dict):
+        counts = [count for count in map(as_count, value.values()) if count is not None]
+        return float(sum(counts)) if counts else None
+    return None
+
+def as_timestamp(value: Any, now: float) -> float | None:
+    """Read a post time as epoch seconds: epoch seconds or milliseconds, ISO 8601, RFC 2822, "12 May 2024" or a relative age like "3d"."""
+    if isinstance(value, dict):
+        value = value.get("timestamp") or value.get("date")
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value.strip())
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    if not isinstance(value, str):
+        return None
+    relative = _RELATIVE_AGE.match(value.strip())
+    if relative:
+        unit = relative.group(2).lower()
+        return now - int(relative.group(1)) * _RELATIVE_AGE_SECONDS[unit[:2] if unit[:2] in ("mi", "mo") else unit[0]]
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
         try:
-            response = await client.get(
-                f"{LINKEDIN_API_BASE}/posts/search",
-                headers=headers,
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching LinkedIn posts search: {e}")
+            parsed = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            parsed = None
+    if parsed is None:
+        for date_format in _DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(value.strip(), date_format)
+                break
+            except ValueError:
+                continue
+        else:
             return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
 
-@mcp.tool()
-async def search_posts(keyword: str) -> str:
-    """Get essential analytics data from LinkedIn posts search for a given keyword."""
-    data = await fetch_posts_search(keyword)
-    if not data:
-        return "Unable to fetch LinkedIn posts search data."
-    
-    # Filter and limit response size for analytics focus
-    filtered_data = extract_posts_essentials(data, max_posts=RESPONSE_LIMITS["max_search_results"])
-    limited_data = limit_response_size(filtered_data, max_chars=RESPONSE_LIMITS["linkedin_search"])
-    
-    return json.dumps(limited_data, indent=2)
-
-# ---- LINKEDIN COMPANY POSTS TOOL ----
-async def fetch_company_posts(company_identifier: str) -> dict[str, Any] | None:
-    params = {"company": company_identifier}
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": LINKEDIN_HOST
+def engagement_columns(posts: list) -> tuple[dict[str, list[float | None]], list[float | None], list[dict]]:
+    """Split posts into one column per metric (None where missing), their timestamps and their extracted fields."""
+    now = time.time()
+    columns: dict[str, list[float | None]] = {metric: [] for metric in ENGAGEMENT_METRICS}
+    timestamps = []
+    rows = []
+    for post in posts:
+        if not isinstance(post, dict):
+            continue
+        row = extract_with_schema(post, ENGAGEMENT_POST_SCHEMA)
+        counts = {metric: as_count(row.get(metric)) for metric in ("likes", "comments", "reposts", "reactions")}
+        # Reactions include likes where the provider reports both, so only the larger one counts
+        reach = [count for count in (counts["likes"], counts["reactions"]) if count is not None]
+        parts = [max(reach)] if reach else []
+        parts += [count for count in (counts["comments"], counts["reposts"]) if count is not None]
+        counts["engagement"] = sum(parts) if parts else None
+        for metric in ENGAGEMENT_METRICS:
+            columns[metric].append(counts[metric])
+        timestamps.append(as_timestamp(row.get("posted_at"), now))
+        rows.append(row)
+    return columns, timestamps, rows
+
+def _percentile(ordered: list[float], q: float) -> float:
+    """Linear-interpolated percentile of sorted values (NumPy's default method)."""
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def summarize_columns(columns: dict[str, list[float | None]]) -> dict[str, dict]:
+    """Count, total, mean, percentiles and max per metric, over the posts that report it."""
+    present = {metric: values for metric, values in columns.items() if any(value is not None for value in values)}
+    if not present:
+        return {}
+    summaries: dict[str, dict] = {}
+    if analytics_backend == "numpy":
+        import numpy as np
+        # One (posts x metrics) matrix, NaN where a post lacks a metric; every statistic is a single column-wise call
+        matrix = np.array([[np.nan if value is None else value for value in values] for values in present.values()], dtype=float).T
+        counts = np.count_nonzero(~np.isnan(matrix), axis=0)
+        totals = np.nansum(matrix, axis=0)
+        percentiles = np.nanpercentile(matrix, ANALYTICS_PERCENTILES, axis=0)
+        maxima = np.nanmax(matrix, axis=0)
+        for index, metric in enumerate(present):
+            summaries[metric] = {
+                "count": int(counts[index]),
+                "total": float(totals[index]),
+                "mean": float(totals[index] / counts[index]),
+                "median": float(percentiles[ANALYTICS_PERCENTILES.index(50)][index]),
+                **{f"p{q}": float(percentiles[row][index]) for row, q in enumerate(ANALYTICS_PERCENTILES)},
+                "max": float(maxima[index]),
+            }
+    else:
+        for metric, values in present.items():
+            ordered = sorted(value for value in values if value is not None)
+            total = sum(ordered)
+            summaries[metric] = {
+                "count": len(ordered),
+                "total": total,
+                "mean": total / len(ordered),
+                "median": _percentile(ordered, 50),
+                **{f"p{q}": _percentile(ordered, q) for q in ANALYTICS_PERCENTILES},
+                "max": ordered[-1],
+            }
+    for summary in summaries.values():
+        for key, value in summary.items():
+            summary[key] = round(value, 2) if isinstance(value, float) and not value.is_integer() else int(value)
+    return summaries
+
+def posting_cadence(timestamps: list[float | None]) -> dict:
+    """Posting frequency and gaps between consecutive posts."""
+    times = sorted(stamp for stamp in timestamps if stamp is not None)
+    if not times:
+        return {}
+    gaps = [(later - earlier) / 86400 for earlier, later in zip(times, times[1:])]
+    span_days = (times[-1] - times[0]) / 86400
+    weekdays = [0] * 7
+    for stamp in times:
+        weekdays[datetime.fromtimestamp(stamp, timezone.utc).weekday()] += 1
+    cadence = {
+        "first_post": datetime.fromtimestamp(times[0], timezone.utc).date().isoformat(),
+        "last_post": datetime.fromtimestamp(times[-1], timezone.utc).date().isoformat(),
+        "days_since_last_post": round((time.time() - times[-1]) / 86400, 1),
+        "span_days": round(span_days, 1),
+        "posts_dated": len(times),
+        "posts_by_weekday": dict(zip(("mon", "tue", "wed", "thu", "fri", "sat", "sun"), weekdays)),
     }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{LINKEDIN_API_BASE}/company/posts",
-                headers=headers,
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching LinkedIn company posts: {e}")
-            return None
+    if gaps:
+        ordered = sorted(gaps)
+        cadence["posts_per_week"] = round(len(times) / max(span_days / 7, 1 / 7), 2)
+        cadence["median_gap_days"] = round(_percentile(ordered, 50), 2)
+        cadence["longest_gap_days"] = round(ordered[-1], 2)
+    return cadence
 
-@mcp.tool()
-async def get_company_posts(company_identifier: str) -> str:
-    """Get posts of a LinkedIn company by name, URL, or URN."""
-    data = await fetch_company_posts(company_identifier)
-    if not data:
-        return "Unable to fetch LinkedIn company posts data."
-    return json.dumps(data, indent=2)
-
-# ---- LINKEDIN COMPANIES SEARCH TOOL ----
-async def fetch_companies_search(keyword: str) -> dict[str, Any] | None:
-    params = {"keyword": keyword}
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": LINKEDIN_HOST
+def top_posts(columns: dict[str, list[float | None]], rows: list[dict], top_n: int) -> list[dict]:
+    """The top_n posts by engagement, with how far each is above the median post."""
+    engagement = columns["engagement"]
+    ranked = sorted((value, index) for index, value in enumerate(engagement) if value is not None)
+    if not ranked or top_n <= 0:
+        return []
+    median = _percentile([value for value, _ in ranked], 50)
+    outliers = []
+    for value, index in reversed(ranked[-top_n:]):
+        row = rows[index]
+        post = {field: row[field] for field in ("text", "posted_at", "post_link") if field in row}
+        post.update({metric: int(columns[metric][index]) for metric in ENGAGEMENT_METRICS if columns[metric][index] is not None})
+        if median:
+            post["x_median"] = round(value / median, 1)
+        outliers.append(post)
+    return outliers
+
+def analyze_posts(posts: list, top_n: int) -> dict:
+    columns, timestamps, rows = engagement_columns(posts)
+    return {
+        "posts_analyzed": len(rows),
+        "metrics": summarize_columns(columns),
+        "cadence": posting_cadence(timestamps),
+        "top_posts": top_posts(columns, rows, top_n),
     }
-    async with httpx.AsyncClient() as client:
+
+# ---- IDENTIFIER NORMALIZATION ----
+# Tools accept URLs, handles, URNs and ids in many spellings. Each is reduced
+# to one canonical form before it becomes a request parameter, so the same
+# entity always maps to the same cache and in-flight key.
+_POST_URN = re.compile(r"(activity|share|ugcPost)[-:](\d{10,})", re.IGNORECASE)
+_COMPANY_URN = re.compile(r"urn:li:(?:fsd_)?(?:company|organization):(\d+)", re.IGNORECASE)
+_JOB_ID = re.compile(r"(?:jobs/view/(?:[^/?#]*-)?|currentJobId=|urn:li:(?:fsd_)?jobPosting:)(\d+)", re.IGNORECASE)
+
+def _url_segments(value: str, *domains: str) -> tuple[list[str], dict[str, list[str]]] | None:
+    """Decoded path segments and query of value if it is a URL on one of domains, else None."""
+    if not any(domain in value.lower() for domain in domains):
+        return None
+    parts = urlsplit(value if "://" in value else f"https://{value}")
+    return [unquote(segment) for segment in parts.path.split("/") if segment], parse_qs(parts.query)
+
+def _segment_after(segments: list[str], *markers: str) -> tuple[str, str] | None:
+    for index, segment in enumerate(segments[:-1]):
+        if segment.lower() in markers:
+            return segment.lower(), segments[index + 1]
+    return None
+
+def linkedin_username(linkedin_url: str) -> str:
+    """Member vanity name from a profile URL (any subdomain, query string or trailing path) or a bare username."""
+    value = unquote(linkedin_url.strip())
+    parts = _url_segments(value, "linkedin.com")
+    segments = parts[0] if parts else [segment for segment in re.split(r"[/?#]", value) if segment]
+    found = _segment_after(segments, "in")
+    return (found[1] if found else value).strip("/@ ").lower()
+
+def linkedin_company_identifier(identifier: str) -> str:
+    """Numeric id for company URNs and ids, the canonical page URL for company URLs, or the lowercased name."""
+    value = unquote(identifier.strip())
+    urn = _COMPANY_URN.search(value)
+    if urn:
+        return urn.group(1)
+    parts = _url_segments(value, "linkedin.com")
+    found = _segment_after(parts[0], "company", "showcase", "school") if parts else None
+    if found:
+        kind, slug = found
+        return slug if slug.isdigit() else f"https://www.linkedin.com/{kind}/{slug.lower()}/"
+    return value.strip("/ ").lower()
+
+def linkedin_post_url(post_url: str) -> str:
+    """Canonical feed URL for any post URL, activity/share/ugcPost URN or bare activity id."""
+    value = unquote(post_url.strip())
+    urn = _POST_URN.search(value)
+    if urn:
+        kind = {"activity": "activity", "share": "share", "ugcpost": "ugcPost"}[urn.group(1).lower()]
+        return f"https://www.linkedin.com/feed/update/urn:li:{kind}:{urn.group(2)}/"
+    if value.isdigit():
+        return f"https://www.linkedin.com/feed/update/urn:li:activity:{value}/"
+    parts = _url_segments(value, "linkedin.com")
+    if parts:
+        return "https://www.linkedin.com/" + "/".join(parts[0]) + "/"
+    return value
+
+def linkedin_job_url(job_url: str) -> str:
+    """Canonical /jobs/view/<id>/ URL for job URLs (including search pages with currentJobId), URNs and ids."""
+    value = unquote(job_url.strip())
+    job = _JOB_ID.search(value)
+    if job or value.isdigit():
+        return f"https://www.linkedin.com/jobs/view/{job.group(1) if job else value}/"
+    return value
+
+def instagram_username(instagram_url_or_username: str) -> str:
+    """Lowercased Instagram username from a profile URL, @handle or username."""
+    value = unquote(instagram_url_or_username.strip())
+    parts = _url_segments(value, "instagram.com")
+    if parts and parts[0]:
+        segments = parts[0]
+        value = segments[1] if segments[0].lower() == "stories" and len(segments) > 1 else segments[0]
+    return value.strip("/@ ").lower()
+
+def facebook_profile_url(profile_url: str) -> str:
+    """Canonical www.facebook.com URL for a profile or page URL, handle or numeric id."""
+    value = unquote(profile_url.strip())
+    parts = _url_segments(value, "facebook.com", "fb.com")
+    if parts is None:
+        handle = value.strip("/@ ")
+        if handle.isdigit():
+            return f"https://www.facebook.com/profile.php?id={handle}"
+        return f"https://www.facebook.com/{handle.lower()}"
+    segments, query = parts
+    if segments and segments[0].lower() == "profile.php" and query.get("id"):
+        return f"https://www.facebook.com/profile.php?id={query['id'][0]}"
+    if len(segments) == 1:
+        return f"https://www.facebook.com/{segments[0].lower()}"
+    return "https://www.facebook.com/" + "/".join(segments)  # people/..., pages/... keep their full path
+
+# ---- ENDPOINT REGISTRY ----
+# Every upstream endpoint is declared once here; fetch_endpoint() and
+# run_endpoint_tool() implement the request and presentation path for all of
+# them, so caching, pooling, retries and the rest apply uniformly.
+@dataclass(frozen=True)
+class Endpoint:
+    label: str  # used in messages, e.g. "Unable to fetch <label> data."
+    base_url: str
+    path: str
+    params: Callable[..., dict]  # maps tool arguments to query parameters (the JSON body for POST)
+    method: str = "GET"
+    cache_family: str | None = None  # key into CACHE_TTLS; None disables caching
+    rate_class: int = PRIORITY_INTERACTIVE  # lowest scheduling priority for this endpoint's calls
+    paginated: bool = False
+    extractor: Callable[[dict, int], dict] | None = None  # None returns the upstream JSON unchanged
+    response_limit: str | None = None  # key into RESPONSE_LIMITS
+    max_items: int = 0  # items kept by the extractor unless the tool passes max_items
+    failure_message: str | None = None
+    entity_kind: str | None = None  # key into ENTITY_SCHEMAS; None keeps responses out of the local store
+
+ENDPOINTS = {
+    "personal_profile": Endpoint(
+        "LinkedIn personal profile", LINKEDIN_API_BASE, "/profile/detail",
+        lambda linkedin_url: {"username": linkedin_username(linkedin_url)},
+        cache_family="profile",
+        extractor=lambda data, max_items: extract_linkedin_profile_essentials(data),
+        response_limit="linkedin_profile",
+        entity_kind="profile"
+    ),
+    "company_profile": Endpoint(
+        # The /companies/detail endpoint accepts company name, LinkedIn URL, or URN
+        "LinkedIn company profile", LINKEDIN_API_BASE, "/companies/detail",
+        lambda linkedin_url: {"identifier": linkedin_company_identifier(linkedin_url)},
+        cache_family="profile",
+        extractor=lambda data, max_items: extract_with_schema(unwrap_envelope(data), COMPANY_PROFILE_SCHEMA),
+        response_limit="linkedin_company",
+        entity_kind="company"
+    ),
+    "profile_posts": Endpoint(
+        "LinkedIn profile posts", LINKEDIN_API_BASE, "/profile/posts",
+        lambda linkedin_url: {"username": linkedin_username(linkedin_url)},
+        cache_family="posts",
+        extractor=lambda data, max_items: extract_posts_essentials(data, max_posts=max_items),
+        response_limit="linkedin_posts",
+        max_items=RESPONSE_LIMITS["max_posts_returned"],
+        entity_kind="post"
+    ),
+    "profile_comments": Endpoint(
+        "LinkedIn profile comments", LINKEDIN_API_BASE, "/profile/comments",
+        lambda linkedin_url: {"username": linkedin_username(linkedin_url)},
+        cache_family="activity",
+        extractor=lambda data, max_items: extract_items_with_schema(data, PROFILE_COMMENT_ITEM_SCHEMA, "comments", max_items),
+        response_limit="linkedin_activity",
+        max_items=RESPONSE_LIMITS["max_items_returned"],
+        entity_kind="comment"
+    ),
+    "profile_reactions": Endpoint(
+        "LinkedIn profile reactions", LINKEDIN_API_BASE, "/profile/reactions",
+        lambda linkedin_url: {"username": linkedin_username(linkedin_url)},
+        cache_family="activity",
+        extractor=extract_reactions_essentials,
+        response_limit="linkedin_activity",
+        max_items=RESPONSE_LIMITS["max_items_returned"]
+    ),
+    "facebook_profile": Endpoint(
+        "Facebook profile", FACEBOOK_API_BASE, "/profile/details_url",
+        lambda profile_url: {"url": facebook_profile_url(profile_url)},
+        cache_family="profile",
+        extractor=lambda data, max_items: extract_facebook_profile_essentials(data),
+        response_limit="facebook_profile",
+        entity_kind="profile"
+    ),
+    "instagram_profile": Endpoint(
+        "Instagram profile", INSTAGRAM_API_BASE, "/ig_get_fb_profile_hover.php",
+        lambda instagram_url_or_username: {"username_or_url": instagram_username(instagram_url_or_username)},
+        cache_family="profile",
+        extractor=lambda data, max_items: extract_instagram_profile_essentials(data),
+        response_limit="instagram_profile",
+        entity_kind="profile"
+    ),
+    "post_comments": Endpoint(
+        "LinkedIn post comments", LINKEDIN_API_BASE, "/post/comments",
+        lambda post_url: {"post_url": linkedin_post_url(post_url)},
+        cache_family="engagement",
+        paginated=True,
+        extractor=lambda data, max_items: extract_items_with_schema(data, POST_COMMENT_ITEM_SCHEMA, "comments", max_items),
+        response_limit="linkedin_comments",
+        max_items=RESPONSE_LIMITS["max_comments_returned"],
+        entity_kind="comment"
+    ),
+    "post_details": Endpoint(
+        "LinkedIn post details", LINKEDIN_API_BASE, "/post/detail",
+        lambda post_url: {"post_url": linkedin_post_url(post_url)},
+        cache_family="posts",
+        extractor=lambda data, max_items: extract_with_schema(unwrap_envelope(data), POST_DETAILS_SCHEMA),
+        response_limit="linkedin_post",
+        entity_kind="post"
+    ),
+    "post_reactions": Endpoint(
+        "LinkedIn post reactions", LINKEDIN_API_BASE, "/post/reactions",
+        lambda post_url: {"post_url": linkedin_post_url(post_url)},
+        cache_family="engagement",
+        paginated=True,
+        extractor=extract_reactions_essentials,
+        response_limit="linkedin_reactions",
+        max_items=50
+    ),
+    "post_reposts": Endpoint(
+        "LinkedIn post reposts", LINKEDIN_API_BASE, "/post/reposts",
+        lambda post_url: {"post_url": linkedin_post_url(post_url)},
+        cache_family="engagement",
+        paginated=True,
+        extractor=lambda data, max_items: extract_items_with_schema(data, REPOST_ITEM_SCHEMA, "reposts", max_items),
+        response_limit="linkedin_reactions",
+        max_items=50
+    ),
+    "posts_search": Endpoint(
+        "LinkedIn posts search", LINKEDIN_API_BASE, "/posts/search",
+        lambda keyword: {"keyword": keyword},
+        cache_family="search",
+        paginated=True,
+        extractor=lambda data, max_items: extract_posts_essentials(data, max_posts=max_items),
+        response_limit="linkedin_search",
+        max_items=RESPONSE_LIMITS["max_search_results"],
+        entity_kind="post"
+    ),
+    "company_posts": Endpoint(
+        "LinkedIn company posts", LINKEDIN_API_BASE, "/company/posts",
+        lambda company_identifier: {"company": linkedin_company_identifier(company_identifier)},
+        cache_family="posts",
+        extractor=lambda data, max_items: extract_posts_essentials(data, max_posts=max_items),
+        response_limit="linkedin_posts",
+        max_items=RESPONSE_LIMITS["max_posts_returned"],
+        entity_kind="post"
+    ),
+    "companies_search": Endpoint(
+        "LinkedIn companies search", LINKEDIN_API_BASE, "/companies/search",
+        lambda keyword: {"keyword": keyword},
+        cache_family="search",
+        extractor=lambda data, max_items: extract_items_with_schema(data, COMPANY_SEARCH_ITEM_SCHEMA, "companies", max_items),
+        response_limit="linkedin_company_search",
+        max_items=RESPONSE_LIMITS["max_search_results"],
+        entity_kind="company"
+    ),
+    "jobs_search": Endpoint(
+        "LinkedIn jobs search", LINKEDIN_API_BASE, "/jobs/search",
+        lambda keyword, location="": {"keyword": keyword, **({"location": location} if location else {})},
+        cache_family="search",
+        paginated=True,
+        extractor=lambda data, max_items: extract_items_with_schema(data, JOB_SEARCH_ITEM_SCHEMA, "jobs", max_items),
+        response_limit="linkedin_jobs",
+        max_items=RESPONSE_LIMITS["max_items_returned"],
+        entity_kind="job"
+    ),
+    "job_details": Endpoint(
+        "LinkedIn job details", LINKEDIN_API_BASE, "/jobs/detail",
+        lambda job_url: {"job_url": linkedin_job_url(job_url)},
+        cache_family="jobs",
+        extractor=lambda data, max_items: extract_with_schema(unwrap_envelope(data), JOB_DETAILS_SCHEMA),
+        response_limit="linkedin_job",
+        entity_kind="job"
+    ),
+    "health_check": Endpoint(
+        # Status probe: never cached, and never worth delaying agent traffic for
+        "LinkedIn health check", LINKEDIN_API_BASE, "/health",
+        lambda: {},
+        rate_class=PRIORITY_BULK,
+        failure_message="Unable to fetch LinkedIn API health status."
+    ),
+    "google_search": Endpoint(
+        "Google search", SERPER_API_BASE, "/search",
+        lambda query, gl="in", num=10, page=1: {"q": query, "gl": gl, "num": num, "page": page},
+        method="POST",
+        cache_family="search"
+    ),
+}
+
+# ---- LOCAL ENTITY STORE ----
+# Posts, comments, profiles, companies and jobs from every upstream response
+# are upserted into a SQLite table with an FTS5 index and secondary indexes
+# on platform/kind/date, author and company, so search_local can answer
+# follow-up questions without another billed search. Each upstream response
+# is indexed once, by a background writer that batches queued responses into
+# one transaction, so tool calls never wait on it. The store lives in memory
+# unless ENTITY_STORE_PATH names a file.
+ENTITY_STORE_ENABLED = os.getenv("ENTITY_STORE_ENABLED", "true").lower() != "false"
+ENTITY_STORE_PATH = os.getenv("ENTITY_STORE_PATH", ":memory:")
+ENTITY_STORE_MAX_ROWS = int(os.getenv("ENTITY_STORE_MAX_ROWS", "50000"))
+ENTITY_STORE_MAX_BYTES = int(os.getenv("ENTITY_STORE_MAX_BYTES", str(64 * 1024 * 1024)))
+ENTITY_TEXT_COLUMNS = ("title", "text", "author", "company", "url")
+ENTITY_SCHEMAS = {
+    "post": {
+        "id": (("urn", "activity_urn", "post_urn", "share_urn", "post_id", "id"), None),
+        "text": (("text", "content", "commentary", "description"), 4000),
+        "author": (("author.name", "author.full_name", "author_name"), 200),
+        "company": (("company.name", "company_name", "author.company"), 200),
+        "posted_at": (("posted_at", "date", "created_at", "timestamp", "posted_date", "time"), None),
+        "url": (("url", "post_url", "share_url", "link"), 500),
+        "likes": (("likes", "num_likes", "like_count", "stats.likes"), None),
+        "comments": (("comments", "num_comments", "comment_count", "stats.comments"), None),
+    },
+    "comment": {
+        "id": (("urn", "comment_urn", "comment_id", "id"), None),
+        "text": (("text", "comment", "content", "commentary"), 4000),
+        "author": (("author.name", "author.full_name", "commenter.name", "name"), 200),
+        "posted_at": (("created_at", "date", "posted_at", "timestamp"), None),
+        "url": (("comment_url", "url"), 500),
+        "post_url": (("post.url", "post_url"), 500),
+    },
+    "profile": {
+        "id": (("public_identifier", "username", "profile_id", "urn", "id"), None),
+        "title": (("name", "full_name", "username"), 200),
+        "text": (("headline", "biography", "about", "summary", "description"), 4000),
+        "company": (("current_company.name", "company.name", "company"), 200),
+        "location": (("location", "city"), 200),
+        "url": (("url", "profile_url", "linkedin_url"), 500),
+        "followers": (("followers", "follower_count", "followers_count"), None),
+    },
+    "company": {
+        "id": (("urn", "company_id", "universal_name", "id"), None),
+        "title": (("name", "company_name", "title"), 200),
+        "text": (("description", "tagline", "about", "summary"), 4000),
+        "company": (("name", "company_name", "title"), 200),
+        "industry": (("industry", "industries"), 200),
+        "url": (("url", "linkedin_url", "company_url"), 500),
+        "followers": (("followers", "follower_count", "followers_count"), None),
+    },
+    "job": {
+        "id": (("job_id", "urn", "id"), None),
+        "title": (("title", "job_title"), 200),
+        "text": (("description", "job_description"), 4000),
+        "company": (("company.name", "company_name", "company"), 200),
+        "location": (("location", "formatted_location"), 200),
+        "posted_at": (("posted_at", "listed_at", "date", "posted_date"), None),
+        "url": (("url", "job_url", "link"), 500),
+    },
+}
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching every word, the last one as a prefix; "" if it has no words."""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"' for word in words[:-1]) + (f' "{words[-1]}"*' if words else "")
+
+class EntityStore:
+    """SQLite entity table with an external-content FTS5 index kept in sync by triggers.
+
+    Like DiskCache, calls run in a worker thread behind a lock, and WAL mode
+    lets several server processes share a file store.
+    """
+
+    def __init__(self, path: str, max_rows: int, max_bytes: int):
+        self.path = path
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._pending: list[tuple[str, dict, dict]] = []
+        self._writer: asyncio.Task | None = None
+        self.stats = {"upserts": 0, "searches": 0, "evictions": 0, "errors": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS entities (
+                    id INTEGER PRIMARY KEY,
+                    key TEXT NOT NULL UNIQUE,
+                    platform TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    title TEXT,
+                    text TEXT,
+                    author TEXT,
+                    company TEXT,
+                    url TEXT,
+                    posted_at REAL,
+                    fetched_at REAL NOT NULL,
+                    source TEXT NOT NULL,
+                    fields TEXT NOT NULL,
+                    size INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS entities_platform ON entities (platform, kind, posted_at);
+                CREATE INDEX IF NOT EXISTS entities_author ON entities (author COLLATE NOCASE);
+                CREATE INDEX IF NOT EXISTS entities_company ON entities (company COLLATE NOCASE);
+                CREATE INDEX IF NOT EXISTS entities_posted ON entities (posted_at);
+                CREATE INDEX IF NOT EXISTS entities_fetched ON entities (fetched_at);
+                CREATE VIRTUAL TABLE IF NOT EXISTS entities_fts USING fts5(
+                    title, text, author, company, content='entities', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+                );
+                CREATE TRIGGER IF NOT EXISTS entities_ai AFTER INSERT ON entities BEGIN
+                    INSERT INTO entities_fts (rowid, title, text, author, company) VALUES (new.id, new.title, new.text, new.author, new.company);
+                END;
+                CREATE TRIGGER IF NOT EXISTS entities_ad AFTER DELETE ON entities BEGIN
+                    INSERT INTO entities_fts (entities_fts, rowid, title, text, author, company) VALUES ('delete', old.id, old.title, old.text, old.author, old.company);
+                END;
+                CREATE TRIGGER IF NOT EXISTS entities_au AFTER UPDATE ON entities BEGIN
+                    INSERT INTO entities_fts (entities_fts, rowid, title, text, author, company) VALUES ('delete', old.id, old.title, old.text, old.author, old.company);
+                    INSERT INTO entities_fts (rowid, title, text, author, company) VALUES (new.id, new.title, new.text, new.author, new.company);
+                END;
+            """)
+            self._conn = conn
+        return self._conn
+
+    def _upsert(self, rows: list[tuple]) -> int:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("""
+                    INSERT INTO entities (key, platform, kind, title, text, author, company, url, posted_at, fetched_at, source, fields, size)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (key) DO UPDATE SET
+                        title = excluded.title, text = excluded.text, author = excluded.author,
+                        company = excluded.company, url = excluded.url,
+                        posted_at = COALESCE(excluded.posted_at, posted_at),
+                        fetched_at = excluded.fetched_at, source = excluded.source, fields = excluded.fields, size = excluded.size
+                """, rows)
+                evicted = self._evict(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return evicted
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        """Drop the least recently fetched rows until the store fits max_rows and max_bytes."""
+        rows, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entities").fetchone()
+        if rows <= self.max_rows and total <= self.max_bytes:
+            return 0
+        evicted = 0
+        if rows > self.max_rows:
+            evicted = conn.execute(
+                "DELETE FROM entities WHERE id IN (SELECT id FROM entities ORDER BY fetched_at LIMIT ?)", (rows - self.max_rows,)
+            ).rowcount
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entities").fetchone()[0]
+        # Walk the oldest rows a batch at a time so a large store is never read in full
+        while total > self.max_bytes:
+            batch = []
+            for entity_id, size in conn.execute("SELECT id, size FROM entities ORDER BY fetched_at LIMIT 256").fetchall():
+                batch.append((entity_id,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+            if not batch:
+                break
+            conn.executemany("DELETE FROM entities WHERE id = ?", batch)
+            evicted += len(batch)
+        return evicted
+
+    def _index(self, responses: list[tuple[str, dict, dict]]) -> tuple[int, int]:
+        rows = [row for name, params, data in responses for row in entity_rows(name, ENDPOINTS[name], params, data)]
+        return len(rows), (self._upsert(rows) if rows else 0)
+
+    def _search(self, query: str, filters: dict[str, str], since: float | None, until: float | None, limit: int) -> tuple[list[dict], int]:
+        clauses: list[str] = []
+        args: list[Any] = []
+        match = fts_query(query)
+        if match:
+            columns = "entities.*, snippet(entities_fts, 1, '[', ']', '...', 24) AS snippet"
+            source = "entities_fts JOIN entities ON entities.id = entities_fts.rowid"
+            clauses.append("entities_fts MATCH ?")
+            args.append(match)
+            order = "bm25(entities_fts)"
+        else:
+            columns, source, order = "entities.*, NULL AS snippet", "entities", "posted_at IS NULL, posted_at DESC, fetched_at DESC"
+        for column, value in filters.items():
+            if value:
+                clauses.append(f"entities.{column} = ? COLLATE NOCASE" if column in ("author", "company") else f"entities.{column} = ?")
+                args.append(value)
+        if since is not None:
+            clauses.append("entities.posted_at >= ?")
+            args.append(since)
+        if until is not None:
+            clauses.append("entities.posted_at <= ?")
+            args.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            conn = self._connect()
+            conn.row_factory = sqlite3.Row
+            try:
+                rows = conn.execute(f"SELECT {columns} FROM {source} {where} ORDER BY {order} LIMIT ?", (*args, limit)).fetchall()
+                total = conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
+            finally:
+                conn.row_factory = None
+        return [self._result(row) for row in rows], total
+
+    @staticmethod
+    def _result(row: sqlite3.Row) -> dict:
+        result = {"platform": row["platform"], "kind": row["kind"]}
+        result.update((column, row[column]) for column in ENTITY_TEXT_COLUMNS if row[column] is not None)
+        result.update(json_loads(row["fields"]))
+        result.pop("id", None)
+        if row["snippet"]:
+            result["text"] = row["snippet"]
+        elif isinstance(result.get("text"), str) and len(result["text"]) > 300:
+            result["text"] = result["text"][:300] + "..."
+        result["fetched_at"] = datetime.fromtimestamp(row["fetched_at"], timezone.utc).isoformat(timespec="seconds")
+        return result
+
+    def add(self, name: str, params: dict, data: dict) -> None:
+        """Queue one upstream response for endpoint name to be indexed in the background."""
+        self._pending.append((name, params, data))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_pending())
+
+    async def _write_pending(self) -> None:
+        while self._pending:
+            responses, self._pending = self._pending, []
+            try:
+                upserts, evicted = await asyncio.to_thread(self._index, responses)
+                self.stats["upserts"] += upserts
+                self.stats["evictions"] += evicted
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                self.stats["errors"] += 1
+                logger.error("Error writing entity store: %s", e)
+
+    async def flush(self) -> None:
+        """Wait until every queued response is indexed."""
+        if self._writer is not None and not self._writer.done():
+            await asyncio.shield(self._writer)
+
+    async def search(self, query: str, filters: dict[str, str], since: float | None, until: float | None, limit: int) -> tuple[list[dict], int]:
+        self.stats["searches"] += 1
+        await self.flush()  # include what the calls before this one fetched
+        return await asyncio.to_thread(self._search, query, filters, since, until, limit)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "path": self.path, "max_rows": self.max_rows, "max_bytes": self.max_bytes, "queued": len(self._pending)}
+
+def entity_rows(name: str, endpoint: Endpoint, params: dict, data: dict) -> list[tuple]:
+    """Build entity table rows from a list response's items or a single-object response."""
+    schema = ENTITY_SCHEMAS[endpoint.entity_kind]
+    platform = UPSTREAM_NAMES[endpoint.base_url]
+    single = find_item_list(data) is None
+    objects = [unwrap_envelope(data)] if single else [item for item in page_items(data) if isinstance(item, dict)]
+    now = time.time()
+    rows = []
+    for obj in objects:
+        fields = extract_with_schema(obj, schema)
+        if not fields:
+            continue
+        identity = fields.get("id") or (fields.get("url") if endpoint.entity_kind != "comment" else None)
+        if not identity and single:
+            identity = "|".join(str(value) for value in params.values())  # the normalized identifier it was requested by
+        if not identity:
+            identity = uuid.uuid5(uuid.NAMESPACE_URL, json_dumps_bytes(fields).decode()).hex
+        columns = {column: fields.get(column) if isinstance(fields.get(column), str) else None for column in ENTITY_TEXT_COLUMNS}
+        # Text that has its own column isn't repeated in the fields JSON
+        extra = json_dumps_bytes({field: value for field, value in fields.items() if columns.get(field) is None}).decode()
+        size = sum(len(value.encode()) for value in columns.values() if value) + len(extra.encode())
+        rows.append((
+            f"{platform}:{endpoint.entity_kind}:{identity}", platform, endpoint.entity_kind,
+            *columns.values(), as_timestamp(fields.get("posted_at"), now), now, name, extra, size,
+        ))
+    return rows
+
+entity_store = EntityStore(ENTITY_STORE_PATH, ENTITY_STORE_MAX_ROWS, ENTITY_STORE_MAX_BYTES) if ENTITY_STORE_ENABLED else None
+
+# ---- REQUEST EXECUTOR ----
+# Errors behind failed fetch_endpoint() calls, collected for callers that
+# set a list here and report why they came back empty. A list (rather than
+# the error itself) so failures inside page prefetch tasks reach the caller.
+fetch_errors: contextvars.ContextVar[list[BaseException] | None] = contextvars.ContextVar("fetch_errors", default=None)
+
+def describe_fetch_error(name: str, errors: list[BaseException] | None) -> str:
+    """Agent-facing failure message for an endpoint, with the reason of the last recorded error."""
+    endpoint = ENDPOINTS[name]
+    message = endpoint.failure_message or f"Unable to fetch {endpoint.label} data."
+    error = errors[-1] if errors else None
+    if isinstance(error, (DeadlineExceeded, TimeoutError)):
+        reason = "the tool call's deadline ran out first"
+    elif isinstance(error, (RateLimitExceeded, CircuitOpenError, MissingAPIKeyError)):
+        reason = str(error)
+    elif isinstance(error, httpx.HTTPStatusError):
+        reason = f"HTTP {error.response.status_code}"
+    else:
+        return message
+    return f"{message.rstrip('.')}: {reason}."
+
+async def fetch_endpoint(name: str, *args: Any, cursor: str = "", refresh: bool = False) -> dict[str, Any] | None:
+    """Fetch one endpoint through the cache and upstream layers; returns None on failure.
+
+    refresh=True skips the cache lookup but still stores the fresh response.
+    """
+    endpoint = ENDPOINTS[name]
+    params = endpoint.params(*args)
+    if cursor:
+        params.update(cursor_params(cursor))
+    key = cache_key(name, params)
+    if PREFETCH_ENABLED and not cursor and not refresh and request_priority.get() < PRIORITY_PREFETCH:
+        record_access(key, name, args)
+
+    cache_hit = True
+
+    async def fetch() -> Any:
+        nonlocal cache_hit
+        cache_hit = False
+        token = request_priority.set(max(request_priority.get(), endpoint.rate_class))
+        endpoint_token = current_endpoint.set(name)
+        index = functools.partial(entity_store.add, name, params) if endpoint.entity_kind and entity_store is not None else None
         try:
-            response = await client.get(
-                f"{LINKEDIN_API_BASE}/companies/search",
-                headers=headers,
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
+            if endpoint.method == "GET":
+                data = await upstream_request(endpoint.base_url, "GET", endpoint.path, params=params or None, on_response=index)
+            else:
+                data = await upstream_request(endpoint.base_url, endpoint.method, endpoint.path, json_body=params, on_response=index)
         except Exception as e:
-            print(f"Error fetching LinkedIn companies search: {e}")
+            logger.warning("Error fetching %s: %s", endpoint.label, e, extra={"status": error_class(e)})
+            metrics.record_error(name, e)
+            errors = fetch_errors.get()
+            if errors is not None:
+                errors.append(e)
             return None
+        finally:
+            current_endpoint.reset(endpoint_token)
+            request_priority.reset(token)
+        return data
 
-@mcp.tool()
-async def search_companies(keyword: str) -> str:
-    """Search for LinkedIn companies using a keyword with optional filters."""
-    data = await fetch_companies_search(keyword)
+    data = await read_through_cache(key, endpoint.cache_family, fetch, refresh)
+    metrics.record_request(name, cache_hit)
+    return data
+
+def summarize_endpoint(name: str, data: dict, max_chars: int, max_items: int | None = None) -> Any:
+    """Apply an endpoint's extractor and size budget to a successful response."""
+    endpoint = ENDPOINTS[name]
+    if endpoint.extractor is None:
+        return data
+    max_items = endpoint.max_items if max_items is None else max_items
+    filtered_data = endpoint.extractor(data, max_items)
+    result = limit_response_size(filtered_data, max_chars=max_chars, max_items=max_items)
+    emitted = emitted_items(result)
+    if emitted is not None:
+        # The extractor counted items before the size limit dropped any
+        for key, value in result.items():
+            if key.endswith("_returned") and isinstance(value, int):
+                result[key] = emitted
+    return result
+
+def emitted_items(result: Any) -> int | None:
+    """Number of items left in a summarized list response, or None if it has no item list."""
+    path = find_item_list(result) if isinstance(result, dict) else None
+    return None if path is None else len(page_items(result))
+
+async def run_endpoint_tool(name: str, *args: Any, raw: bool = False, max_items: int | None = None, cursor: str = "") -> str:
+    """Shared body of the single-endpoint tools: fetch (all pages if paginated), filter, serialize."""
+    endpoint = ENDPOINTS[name]
+    max_items = endpoint.max_items if max_items is None else max_items
+    summarize = not raw and endpoint.extractor is not None
+    max_chars = RESPONSE_LIMITS[endpoint.response_limit] if summarize else 0
+    cursors: list[str | None] = [None]
+    errors: list[BaseException] = []
+    token = fetch_errors.set(errors)
+    try:
+        if endpoint.paginated:
+            if summarize:
+                max_items = max(1, min(max_items, PAGINATION_MAX_CHARS // PAGINATION_ITEM_CHARS))
+                max_chars = min(PAGINATION_MAX_CHARS, max(max_chars, max_items * PAGINATION_ITEM_CHARS))
+            data, cursors = await collect_pages(lambda page: fetch_endpoint(name, *args, cursor=page), cursor, max_items)
+        else:
+            data = await fetch_endpoint(name, *args)
+    finally:
+        fetch_errors.reset(token)
     if not data:
-        return "Unable to fetch LinkedIn companies search data."
-    return json.dumps(data, indent=2)
-
-# ---- LINKEDIN JOBS SEARCH TOOL ----
-async def fetch_jobs_search(keyword: str, location: str = "") -> dict[str, Any] | None:
-    params = {"keyword": keyword}
-    if location:
-        params["location"] = location
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": LINKEDIN_HOST
+        return describe_fetch_error(name, errors)
+    if not summarize:
+        result = data
+    else:
+        # Filter and limit response size for analytics focus
+        result = summarize_endpoint(name, data, max_chars, max_items)
+        emitted = emitted_items(result) if endpoint.paginated else None
+        if emitted and emitted < len(cursors) - 1:
+            # Items that didn't fit the budget are left for the next call: resume
+            # right after the last emitted one, and summarize only what was emitted
+            cursors = cursors[:emitted] + [cursors[emitted]]
+            data = with_items(data, page_items(data)[:emitted])
+            result = summarize_endpoint(name, data, max_chars, emitted)
+    if endpoint.paginated:
+        result = {**result, "next_cursor": cursors[-1]}
+    output = dump_json(result)
+    metrics.record_response(name, len(output.encode()))
+    return output
+
+# ---- WATCHLIST ----
+# Watched profiles and companies keep a high-water mark: the ids of the
+# posts already returned and the newest post time. A sync fetches pages
+# (bypassing the response cache) only until it reaches posts it has seen,
+# and returns just the new ones. Pinned posts at the top of a page don't end
+# the walk; a page ends it when its last post was already seen. Only returned
+# posts count as seen: when more than max_new posts are new, the oldest are
+# returned, so the rest stay at the top of the feed for the next sync.
+# Marks must outlive the server process (stdio clients spawn one per
+# conversation), so the watchlist is kept in a file: next to CACHE_DB_PATH
+# when that is set, otherwise in the user's data directory.
+def _default_watchlist_path() -> str:
+    if CACHE_DB_PATH:
+        return os.path.join(os.path.dirname(os.path.abspath(CACHE_DB_PATH)), "watchlist.db")
+    data_home = os.getenv("XDG_DATA_HOME") or os.getenv("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(data_home, "social_web_scraper", "watchlist.db")
+
+WATCHLIST_DB_PATH = os.getenv("WATCHLIST_DB_PATH") or _default_watchlist_path()
+WATCHLIST_MAX_PAGES = int(os.getenv("WATCHLIST_MAX_PAGES", "5"))
+WATCHLIST_SEEN_IDS = 200  # post ids remembered per entity
+WATCHLIST_SOURCES = {"profile": ("profile_posts", linkedin_username), "company": ("company_posts", linkedin_company_identifier)}
+WATCH_POST_SCHEMA = {
+    **POST_DETAILS_SCHEMA,
+    "text": (("text", "content", "commentary", "description"), 300),
+    "post_link": (("url", "post_url", "share_url", "link"), 300),
+}
+
+@dataclass
+class WatchedEntity:
+    kind: str
+    identifier: str
+    added_at: float
+    last_synced_at: float | None = None
+    latest_posted_at: float | None = None
+    seen_ids: list[str] | None = None  # None until the first sync sets the baseline
+
+class Watchlist:
+    """SQLite-backed watchlist; like DiskCache, calls run in a worker thread behind a lock."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS watchlist (
+                    kind TEXT NOT NULL,
+                    identifier TEXT NOT NULL,
+                    added_at REAL NOT NULL,
+                    last_synced_at REAL,
+                    latest_posted_at REAL,
+                    seen_ids TEXT,
+                    PRIMARY KEY (kind, identifier)
+                )
+            """)
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql: str, rows: list[tuple]) -> int:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                changed = sum(conn.execute(sql, row).rowcount for row in rows)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return changed
+
+    def _entries(self, kind: str) -> list[WatchedEntity]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT kind, identifier, added_at, last_synced_at, latest_posted_at, seen_ids FROM watchlist"
+                " WHERE ? = '' OR kind = ? ORDER BY kind, identifier", (kind, kind)
+            ).fetchall()
+        return [WatchedEntity(*row[:5], json_loads(row[5]) if row[5] else None) for row in rows]
+
+    async def add(self, kind: str, identifiers: list[str]) -> int:
+        now = time.time()
+        return await asyncio.to_thread(
+            self._execute, "INSERT OR IGNORE INTO watchlist (kind, identifier, added_at) VALUES (?, ?, ?)",
+            [(kind, identifier, now) for identifier in identifiers]
+        )
+
+    async def remove(self, kind: str, identifiers: list[str]) -> int:
+        return await asyncio.to_thread(
+            self._execute, "DELETE FROM watchlist WHERE kind = ? AND identifier = ?", [(kind, identifier) for identifier in identifiers]
+        )
+
+    async def entries(self, kind: str = "") -> list[WatchedEntity]:
+        return await asyncio.to_thread(self._entries, kind)
+
+    async def save(self, entity: WatchedEntity) -> None:
+        await asyncio.to_thread(
+            self._execute, "UPDATE watchlist SET last_synced_at = ?, latest_posted_at = ?, seen_ids = ? WHERE kind = ? AND identifier = ?",
+            [(entity.last_synced_at, entity.latest_posted_at, dump_json(entity.seen_ids), entity.kind, entity.identifier)]
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+watchlist = Watchlist(WATCHLIST_DB_PATH)
+
+def post_identity(post: dict) -> str:
+    """Stable id of a post: its upstream id or URL, else a hash of its content."""
+    fields = extract_with_schema(post, ENTITY_SCHEMAS["post"])
+    identity = fields.get("id") or fields.get("url")
+    return str(identity) if identity else uuid.uuid5(uuid.NAMESPACE_URL, json_dumps_bytes(post).decode()).hex
+
+async def sync_entity(entity: WatchedEntity, max_new: int) -> dict:
+    """Fetch posts newer than an entity's high-water mark, advance the mark and return the new posts."""
+    name, _ = WATCHLIST_SOURCES[entity.kind]
+    previously_seen = set(entity.seen_ids or ())
+    seen = set(previously_seen)
+    new_posts: list[dict] = []
+    cursor = ""
+    pages = 0
+    while pages < WATCHLIST_MAX_PAGES:
+        data = await fetch_endpoint(name, entity.identifier, cursor=cursor, refresh=True)
+        pages += 1
+        if not data:
+            if pages == 1:
+                return {"identifier": entity.identifier, "kind": entity.kind, "error": f"Unable to fetch {ENDPOINTS[name].label} data."}
+            break
+        items = [item for item in page_items(data) if isinstance(item, dict)]
+        ids = [post_identity(item) for item in items]
+        page_new = [(item, post_id) for item, post_id in zip(items, ids) if post_id not in seen]
+        new_posts.extend(page_new)
+        seen.update(ids)
+        next_cursor = next_page_cursor(data, cursor, items)
+        # The first sync only takes the newest page as its baseline
+        reached_mark = entity.seen_ids is None or not page_new or ids[-1] in previously_seen
+        if reached_mark or not next_cursor:
+            break
+        cursor = next_cursor
+    now = time.time()
+    # The first sync returns the newest posts and takes its whole page as the baseline
+    returned = new_posts[:max_new] if entity.seen_ids is None else new_posts[-max_new:]
+    marked = new_posts if entity.seen_ids is None else returned
+    new_ids = [post_id for _, post_id in marked]
+    entity.seen_ids = (new_ids + [post_id for post_id in (entity.seen_ids or ()) if post_id not in new_ids])[:WATCHLIST_SEEN_IDS]
+    posts = [extract_with_schema(post, WATCH_POST_SCHEMA) for post, _ in returned]
+    timestamps = [stamp for stamp in (as_timestamp(post.get("posted_at"), now) for post in posts) if stamp]
+    entity.latest_posted_at = max([entity.latest_posted_at or 0.0, *timestamps]) or None
+    entity.last_synced_at = now
+    await watchlist.save(entity)
+    result = {
+        "identifier": entity.identifier,
+        "kind": entity.kind,
+        "new_posts": posts,
+        "new_count": len(posts),
+        "pages_fetched": pages,
     }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{LINKEDIN_API_BASE}/jobs/search",
-                headers=headers,
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching LinkedIn jobs search: {e}")
-            return None
+    if len(marked) < len(new_posts):
+        result["more_new_posts"] = True  # returned by the next sync
+    return result
+
+# ---- PREFETCH SCHEDULER ----
+# Optional cache warming. First-page tool fetches are counted per cache key
+# with an exponentially decaying score; every PREFETCH_INTERVAL seconds the
+# hottest keys whose entry is missing or within the last PREFETCH_LEAD of
+# its TTL are refreshed, one at a time, at PRIORITY_PREFETCH. A host is only
+# used while nothing is queued on it, nothing has queued in the last
+# PREFETCH_COOLDOWN seconds and more than PREFETCH_RESERVE of its bucket is
+# free, so tool calls always win the rate limit budget.
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "false").lower() == "true"
+PREFETCH_INTERVAL = float(os.getenv("PREFETCH_INTERVAL", "60"))
+PREFETCH_MIN_SCORE = float(os.getenv("PREFETCH_MIN_SCORE", "2"))  # decayed accesses before a key is warmed
+PREFETCH_HALF_LIFE = float(os.getenv("PREFETCH_HALF_LIFE", str(24 * 3600)))
+PREFETCH_MAX_PER_CYCLE = int(os.getenv("PREFETCH_MAX_PER_CYCLE", "20"))
+PREFETCH_LEAD = 0.2  # fraction of the TTL before staleness at which an entry is refreshed
+PREFETCH_RESERVE = float(os.getenv("PREFETCH_RESERVE", "0.5"))  # fraction of each bucket left for tool calls
+PREFETCH_COOLDOWN = 30.0
+PREFETCH_TRACKED_KEYS = 2000
+
+@dataclass
+class AccessRecord:
+    name: str
+    args: tuple
+    score: float
+    updated: float
+    prefetched_at: float = float("-inf")
+
+    def decayed_score(self, now: float) -> float:
+        return self.score * 0.5 ** ((now - self.updated) / PREFETCH_HALF_LIFE)
+
+access_records: OrderedDict[str, AccessRecord] = OrderedDict()
+prefetch_stats = {"cycles": 0, "refreshed": 0, "failed": 0, "skipped_no_capacity": 0}
 
+def record_access(key: str, name: str, args: tuple) -> None:
+    now = time.monotonic()
+    record = access_records.get(key)
+    if record is None:
+        record = access_records[key] = AccessRecord(name, args, 0.0, now)
+    record.score = record.decayed_score(now) + 1
+    record.updated = now
+    access_records.move_to_end(key)
+    while len(access_records) > PREFETCH_TRACKED_KEYS:
+        access_records.popitem(last=False)
+
+def prefetch_candidates(now: float) -> list[tuple[str, AccessRecord]]:
+    """Keys worth warming, hottest first: cacheable, accessed often enough and missing or about to go stale."""
+    candidates = []
+    for key, record in access_records.items():
+        family = ENDPOINTS[record.name].cache_family
+        if family is None or record.decayed_score(now) < PREFETCH_MIN_SCORE:
+            continue
+        lead = CACHE_TTLS[family] * PREFETCH_LEAD
+        fresh_for = response_cache.fresh_for(key)
+        if (fresh_for is None or fresh_for < lead) and now - record.prefetched_at >= lead:
+            candidates.append((key, record))
+    candidates.sort(key=lambda candidate: candidate[1].decayed_score(now), reverse=True)
+    return candidates
+
+async def run_prefetch_cycle() -> None:
+    prefetch_stats["cycles"] += 1
+    warmed = 0
+    for key, record in prefetch_candidates(time.monotonic()):
+        if warmed >= PREFETCH_MAX_PER_CYCLE:
+            break
+        if not rate_limiters[ENDPOINTS[record.name].base_url].has_spare_capacity(PREFETCH_RESERVE, PREFETCH_COOLDOWN):
+            prefetch_stats["skipped_no_capacity"] += 1
+            continue
+        record.prefetched_at = time.monotonic()
+        warmed += 1
+        data = await fetch_endpoint(record.name, *record.args, refresh=True)
+        prefetch_stats["refreshed" if data else "failed"] += 1
+
+async def prefetch_periodically() -> None:
+    tokens = (
+        (request_priority, request_priority.set(PRIORITY_PREFETCH)),
+        (request_deadline, request_deadline.set(None)),
+    )
+    try:
+        while True:
+            await asyncio.sleep(PREFETCH_INTERVAL)
+            try:
+                await run_prefetch_cycle()
+            except Exception as e:
+                logger.error("Error prefetching: %s", e)
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+# ---- LINKEDIN PROFILE TOOLS ----
 @mcp.tool()
-async def search_jobs(keyword: str, location: str = "") -> str:
-    """Search for jobs on LinkedIn with various filters and parameters."""
-    data = await fetch_jobs_search(keyword, location)
-    if not data:
-        return "Unable to fetch LinkedIn jobs search data."
-    return json.dumps(data, indent=2)
-
-# ---- LINKEDIN JOB DETAILS TOOL ----
-async def fetch_job_details(job_url: str) -> dict[str, Any] | None:
-    params = {"job_url": job_url}
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": LINKEDIN_HOST
-    }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{LINKEDIN_API_BASE}/jobs/detail",
-                headers=headers,
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching LinkedIn job details: {e}")
-            return None
+@instrumented
+async def get_personal_profile(linkedin_url: str) -> str:
+    """Fetch essential LinkedIn personal profile analytics data for a given URL."""
+    return await run_endpoint_tool("personal_profile", linkedin_url)
 
 @mcp.tool()
-async def get_job_details(job_url: str) -> str:
-    """Get detailed information about a specific LinkedIn job posting."""
-    data = await fetch_job_details(job_url)
-    if not data:
-        return "Unable to fetch LinkedIn job details data."
-    return json.dumps(data, indent=2)
+@instrumented
+async def get_company_profile(linkedin_url: str, raw: bool = False) -> str:
+    """Fetch essential LinkedIn company page analytics data for a given URL; raw=True returns the full upstream data."""
+    return await run_endpoint_tool("company_profile", linkedin_url, raw=raw)
 
-# ---- LINKEDIN HEALTH CHECK TOOL ----
-async def fetch_health_check() -> dict[str, Any] | None:
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": LINKEDIN_HOST
-    }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{LINKEDIN_API_BASE}/health",
-                headers=headers,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching LinkedIn health check: {e}")
-            return None
+@mcp.tool()
+@instrumented
+async def get_profile_posts(linkedin_url: str) -> str:
+    """Get recent posts analytics data for a LinkedIn user by their URL or username."""
+    return await run_endpoint_tool("profile_posts", linkedin_url)
+
+@mcp.tool()
+@instrumented
+async def get_profile_comments(linkedin_url: str, raw: bool = False) -> str:
+    """Get recent comments of a LinkedIn user by their URL or username; raw=True returns the full upstream data."""
+    return await run_endpoint_tool("profile_comments", linkedin_url, raw=raw)
+
+@mcp.tool()
+@instrumented
+async def get_profile_reactions(linkedin_url: str, raw: bool = False) -> str:
+    """Get recent reactions of a LinkedIn user by their URL or username; raw=True returns the full upstream data."""
+    return await run_endpoint_tool("profile_reactions", linkedin_url, raw=raw)
+
+# ---- FACEBOOK PROFILE TOOL ----
+@mcp.tool()
+@instrumented
+async def get_facebook_profile(profile_url: str) -> str:
+    """Fetch essential Facebook profile analytics data for a given public URL."""
+    return await run_endpoint_tool("facebook_profile", profile_url)
+
+# ---- INSTAGRAM PROFILE TOOL ----
+@mcp.tool()
+@instrumented
+async def get_instagram_profile(instagram_url_or_username: str) -> str:
+    """Fetch essential Instagram profile analytics data for a given public username or URL."""
+    return await run_endpoint_tool("instagram_profile", instagram_url_or_username)
+
+# ---- LINKEDIN POST TOOLS ----
+@mcp.tool()
+@instrumented
+async def get_post_comments(post_url: str, max_items: int = RESPONSE_LIMITS["max_comments_returned"], cursor: str = "") -> str:
+    """Get essential comments and engagement analytics from LinkedIn posts.
+
+    Fetches pages until max_items comments are collected; pass the returned
+    next_cursor back as cursor to continue.
+    """
+    return await run_endpoint_tool("post_comments", post_url, max_items=max_items, cursor=cursor)
+
+@mcp.tool()
+@instrumented
+async def get_post_details(post_url: str, raw: bool = False) -> str:
+    """Get essential post and author information for a given LinkedIn post; raw=True returns the full upstream data."""
+    return await run_endpoint_tool("post_details", post_url, raw=raw)
+
+@mcp.tool()
+@instrumented
+async def get_post_reactions(post_url: str, max_items: int = 50, cursor: str = "", raw: bool = False) -> str:
+    """Get reactions data for a given LinkedIn post, up to max_items reactions; pass the returned next_cursor back as cursor to continue.
+
+    Returns counts per reaction type plus a sample of reactors; raw=True
+    returns the full upstream data.
+    """
+    return await run_endpoint_tool("post_reactions", post_url, raw=raw, max_items=max_items, cursor=cursor)
+
+@mcp.tool()
+@instrumented
+async def get_post_reposts(post_url: str, max_items: int = 50, cursor: str = "", raw: bool = False) -> str:
+    """Get repost data for a given LinkedIn post, up to max_items reposts; pass the returned next_cursor back as cursor to continue.
+
+    raw=True returns the full upstream data.
+    """
+    return await run_endpoint_tool("post_reposts", post_url, raw=raw, max_items=max_items, cursor=cursor)
+
+@mcp.tool()
+@instrumented
+async def search_posts(keyword: str, max_items: int = RESPONSE_LIMITS["max_search_results"], cursor: str = "") -> str:
+    """Get essential analytics data from LinkedIn posts search for a given keyword.
+
+    Fetches pages until max_items posts are collected; pass the returned
+    next_cursor back as cursor to continue.
+    """
+    return await run_endpoint_tool("posts_search", keyword, max_items=max_items, cursor=cursor)
+
+# ---- LINKEDIN COMPANY TOOLS ----
+@mcp.tool()
+@instrumented
+async def get_company_posts(company_identifier: str, raw: bool = False) -> str:
+    """Get recent posts analytics data of a LinkedIn company by name, URL, or URN; raw=True returns the full upstream data."""
+    return await run_endpoint_tool("company_posts", company_identifier, raw=raw)
+
+@mcp.tool()
+@instrumented
+async def search_companies(keyword: str, raw: bool = False) -> str:
+    """Search for LinkedIn companies using a keyword with optional filters; raw=True returns the full upstream data."""
+    return await run_endpoint_tool("companies_search", keyword, raw=raw)
+
+# ---- LINKEDIN JOBS TOOLS ----
+@mcp.tool()
+@instrumented
+async def search_jobs(keyword: str, location: str = "", max_items: int = 10, cursor: str = "", raw: bool = False) -> str:
+    """Search for jobs on LinkedIn with various filters and parameters, up to max_items jobs; pass the returned next_cursor back as cursor to continue.
+
+    raw=True returns the full upstream data.
+    """
+    return await run_endpoint_tool("jobs_search", keyword, location, raw=raw, max_items=max_items, cursor=cursor)
 
 @mcp.tool()
+@instrumented
+async def get_job_details(job_url: str, raw: bool = False) -> str:
+    """Get essential information about a specific LinkedIn job posting; raw=True returns the full upstream data."""
+    return await run_endpoint_tool("job_details", job_url, raw=raw)
+
+# ---- LINKEDIN HEALTH CHECK TOOL ----
+@mcp.tool()
+@instrumented
 async def check_api_health() -> str:
     """Check if the LinkedIn API is running and healthy."""
-    data = await fetch_health_check()
-    if not data:
-        return "Unable to fetch LinkedIn API health status."
-    return json.dumps(data, indent=2)
+    return await run_endpoint_tool("health_check")
 
 # ---- WEBSITE SCRAPER TOOL (Google Serper) ----
-async def fetch_google_search(query: str, gl: str = "in", num: int = 10, page: int = 1) -> dict[str, Any] | None:
-    payload = {
-        "q": query,
-        "gl": gl,
-        "num": num,
-        "page": page
-    }
-    headers = {
-        "X-API-KEY": SERPER_API_KEY,
-        "Content-Type": "application/json"
-    }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{SERPER_API_BASE}/search",
-                headers=headers,
-                json=payload,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching Google search data: {e}")
-            return None
-
 @mcp.tool()
+@instrumented
 async def scrape_website(query: str, gl: str = "in", num: int = 10, page: int = 1) -> str:
     """Fetch search results for a given query using Google Serper API."""
-    data = await fetch_google_search(query, gl, num, page)
+    return await run_endpoint_tool("google_search", query, gl, num, page)
+
+# ---- ENGAGEMENT ANALYTICS TOOL ----
+@mcp.tool()
+@instrumented
+async def analyze_engagement(source: str, kind: str = "profile", max_posts: int = ANALYTICS_MAX_POSTS, top_n: int = 5) -> str:
+    """Summarize engagement over up to max_posts LinkedIn posts instead of returning the posts themselves.
+
+    kind is "profile" (source is a profile URL or username), "company" (a
+    company name, URL or URN) or "search" (a keyword). Returns count, total,
+    mean, median and percentiles of likes, comments, reposts, reactions and
+    total engagement, the posting cadence, and the top_n posts by engagement.
+    """
+    name = ENGAGEMENT_SOURCES.get(kind)
+    if name is None:
+        return f"Unknown kind {kind!r}; use one of: {', '.join(ENGAGEMENT_SOURCES)}."
+    data, cursors = await collect_pages(lambda page: fetch_endpoint(name, source, cursor=page), "", max_posts)
     if not data:
-        return "Unable to fetch Google search data."
-    return json.dumps(data, indent=2)
+        return f"Unable to fetch {ENDPOINTS[name].label} data."
+    summary = await asyncio.to_thread(analyze_posts, page_items(data), top_n)
+    return dump_json({"source": source, "kind": kind, **summary, "more_posts_available": cursors[-1] is not None})
+
+# ---- LOCAL SEARCH TOOL ----
+@mcp.tool()
+@instrumented
+async def search_local(query: str = "", platform: str = "", kind: str = "", author: str = "", company: str = "",
+                       since: str = "", until: str = "", limit: int = 20) -> str:
+    """Search posts, comments, profiles, companies and jobs already fetched in this server, without any API call.
+
+    query matches words in names, titles, text, authors and companies (the
+    last word as a prefix). Optional filters: platform (linkedin, facebook,
+    instagram), kind (post, comment, profile, company, job), exact author or
+    company name (case-insensitive), and since/until as ISO dates or ages
+    like "7d". Results are ranked by relevance, or newest first without a query.
+    """
+    if entity_store is None:
+        return "Local entity store is disabled (ENTITY_STORE_ENABLED=false)."
+    started = time.perf_counter()
+    now = time.time()
+    filters = {"platform": platform.strip().lower(), "kind": kind.strip().lower(), "author": author.strip(), "company": company.strip()}
+    try:
+        results, total = await entity_store.search(
+            query, filters, as_timestamp(since, now) if since else None, as_timestamp(until, now) if until else None, max(1, min(limit, 200))
+        )
+    except sqlite3.Error as e:
+        logger.error("Error searching entity store: %s", e)
+        return "Unable to search the local entity store."
+    return dump_json({
+        "results": results,
+        "returned": len(results),
+        "entities_stored": total,
+        "took_ms": round((time.perf_counter() - started) * 1000, 1),
+    })
+
+# ---- WATCHLIST TOOLS ----
+def _watch_time(stamp: float | None) -> str | None:
+    return datetime.fromtimestamp(stamp, timezone.utc).isoformat(timespec="seconds") if stamp else None
+
+@mcp.tool()
+@instrumented
+async def add_to_watchlist(identifiers: list[str], kind: str = "profile") -> str:
+    """Watch LinkedIn profiles (kind="profile": URLs or usernames) or companies (kind="company": names, URLs or URNs) for new posts."""
+    if kind not in WATCHLIST_SOURCES:
+        return f"Unknown kind {kind!r}; use one of: {', '.join(WATCHLIST_SOURCES)}."
+    _, normalize = WATCHLIST_SOURCES[kind]
+    normalized = list(dict.fromkeys(normalize(identifier) for identifier in identifiers))
+    added = await watchlist.add(kind, normalized)
+    return dump_json({"added": added, "already_watched": len(normalized) - added, "watching": len(await watchlist.entries(kind))})
+
+@mcp.tool()
+@instrumented
+async def remove_from_watchlist(identifiers: list[str], kind: str = "profile") -> str:
+    """Stop watching LinkedIn profiles (kind="profile") or companies (kind="company") and forget their high-water marks."""
+    if kind not in WATCHLIST_SOURCES:
+        return f"Unknown kind {kind!r}; use one of: {', '.join(WATCHLIST_SOURCES)}."
+    _, normalize = WATCHLIST_SOURCES[kind]
+    removed = await watchlist.remove(kind, list(dict.fromkeys(normalize(identifier) for identifier in identifiers)))
+    return dump_json({"removed": removed, "watching": len(await watchlist.entries(kind))})
+
+@mcp.tool()
+@instrumented
+async def get_watchlist(kind: str = "") -> str:
+    """List watched profiles and companies with their last sync and newest seen post time; kind filters to "profile" or "company"."""
+    if kind and kind not in WATCHLIST_SOURCES:
+        return f"Unknown kind {kind!r}; use one of: {', '.join(WATCHLIST_SOURCES)}."
+    return dump_json([
+        {
+            "identifier": entity.identifier,
+            "kind": entity.kind,
+            "added_at": _watch_time(entity.added_at),
+            "last_synced_at": _watch_time(entity.last_synced_at),
+            "latest_post_at": _watch_time(entity.latest_posted_at),
+        }
+        for entity in await watchlist.entries(kind)
+    ])
+
+@mcp.tool()
+@instrumented
+async def sync_watchlist(kind: str = "", max_new_per_entity: int = 20) -> str:
+    """Poll every watched profile and company (or only one kind) and return only posts not returned by a previous sync.
+
+    Entities are polled concurrently as bulk work within the per-host rate
+    limits, and each stops paginating at the first already-seen posts. The
+    first sync of a newly watched entity returns its newest page of posts.
+    Entities without new posts are only counted. An entity with more than
+    max_new_per_entity new posts returns the oldest ones and more_new_posts;
+    the rest come with the next sync.
+    """
+    if kind and kind not in WATCHLIST_SOURCES:
+        return f"Unknown kind {kind!r}; use one of: {', '.join(WATCHLIST_SOURCES)}."
+    entities = await watchlist.entries(kind)
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def sync_one(entity: WatchedEntity) -> dict:
+        async with semaphore:
+            return await sync_entity(entity, max(1, max_new_per_entity))
+
+    token = request_priority.set(PRIORITY_BULK)
+    try:
+        results = await asyncio.gather(*(sync_one(entity) for entity in entities))
+    finally:
+        request_priority.reset(token)
+    failed = sum(1 for result in results if "error" in result)
+    changed = [result for result in results if result.get("new_count") or "error" in result]
+    return dump_json({
+        "synced": len(results) - failed,
+        "failed": failed,
+        "with_new_posts": sum(1 for result in results if result.get("new_count")),
+        "new_posts_total": sum(result.get("new_count", 0) for result in results),
+        "results": changed,
+    })
+
+# ---- BATCH TOOLS ----
+# Batch tools fan out over many identifiers in one tool call. Items run as
+# bulk work (interactive calls are served first on a busy host) and at most
+# BATCH_CONCURRENCY of them are in flight, so the per-host rate limiters
+# pace the rest. A batch whose uncached items can't be paced through the
+# host's rate limit within the call's deadline is rejected up front.
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+
+def batch_upstream_calls(name: str, items: list[str]) -> int:
+    """Number of batch items that aren't in the memory cache and will need an upstream call."""
+    endpoint = ENDPOINTS[name]
+    if endpoint.cache_family is None or not CACHE_ENABLED:
+        return len(items)
+    calls = 0
+    for item in items:
+        if response_cache.fresh_for(cache_key(name, endpoint.params(item))) is None:
+            calls += 1
+    return calls
+
+async def run_batch(name: str, items: list[str]) -> str:
+    """Fetch an endpoint for every item concurrently and return per-item results or errors as one compact payload."""
+    if len(items) > BATCH_MAX_ITEMS:
+        return f"Too many items in batch: {len(items)} (maximum is {BATCH_MAX_ITEMS})."
+    endpoint = ENDPOINTS[name]
+    deadline = request_deadline.get()
+    if deadline is not None:
+        limiter = rate_limiters[endpoint.base_url]
+        calls = batch_upstream_calls(name, items)
+        needed, remaining = limiter.time_for(calls), deadline - time.monotonic()
+        if needed > remaining:
+            fits = max(1, int(limiter.tokens + remaining * limiter.rate))
+            return (
+                f"Batch too large to finish in time: {calls} uncached items need about {needed:.0f}s at the "
+                f"{limiter.name} rate limit of {limiter.rate * 60:g}/min, but this call has {remaining:.0f}s. "
+                f"Send at most {fits} items per batch."
+            )
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def fetch_one(item: str) -> dict:
+        errors: list[BaseException] = []
+        fetch_errors.set(errors)
+        async with semaphore:
+            data = await fetch_endpoint(name, item)
+        if not data:
+            return {"input": item, "error": describe_fetch_error(name, errors)}
+        return {"input": item, "data": summarize_endpoint(name, data, RESPONSE_LIMITS["batch_item"])}
+
+    token = request_priority.set(PRIORITY_BULK)
+    try:
+        results = await asyncio.gather(*(fetch_one(item) for item in items))
+    finally:
+        request_priority.reset(token)
+    failed = sum(1 for result in results if "error" in result)
+    return dump_json({
+        "requested": len(items),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "results": results
+    })
+
+@mcp.tool()
+@instrumented
+async def get_personal_profiles_batch(linkedin_urls: list[str]) -> str:
+    """Fetch essential LinkedIn personal profile data for many URLs or usernames in one call."""
+    return await run_batch("personal_profile", linkedin_urls)
+
+@mcp.tool()
+@instrumented
+async def get_company_profiles_batch(linkedin_urls: list[str]) -> str:
+    """Fetch LinkedIn company page data for many URLs, names or URNs in one call."""
+    return await run_batch("company_profile", linkedin_urls)
+
+@mcp.tool()
+@instrumented
+async def get_posts_details_batch(post_urls: list[str]) -> str:
+    """Get post and author information for many LinkedIn posts in one call."""
+    return await run_batch("post_details", post_urls)
+
+@mcp.tool()
+@instrumented
+async def get_instagram_profiles_batch(instagram_urls_or_usernames: list[str]) -> str:
+    """Fetch essential Instagram profile analytics data for many usernames or URLs in one call."""
+    return await run_batch("instagram_profile", instagram_urls_or_usernames)
+
+# ---- CACHE STATS TOOL ----
+@mcp.tool()
+@instrumented
+async def get_cache_stats() -> str:
+    """Get response cache hit/miss counters, size, per-endpoint-family breakdown, background refreshes and upstream calls saved by coalescing."""
+    stats = response_cache.snapshot()
+    if disk_cache is not None:
+        stats["disk"] = disk_cache.snapshot()
+    stats["in_flight_coalescing"] = {**coalescing_stats, "in_flight": len(_in_flight)}
+    stats["stale_while_revalidate"] = {**revalidation_stats, "in_progress": len(_revalidating)}
+    if entity_store is not None:
+        stats["entity_store"] = entity_store.snapshot()
+    if PREFETCH_ENABLED:
+        stats["prefetch"] = {**prefetch_stats, "tracked_keys": len(access_records)}
+    return dump_json(stats)
+
+# ---- RATE LIMIT STATUS TOOL ----
+@mcp.tool()
+@instrumented
+async def get_rate_limit_status() -> str:
+    """Get the remaining client-side request budget, queue depth, retry counts and upstream quota headers for each API host."""
+    status = {
+        limiter.name: {**limiter.snapshot(), **retry_stats[limiter.name]}
+        for limiter in rate_limiters.values()
+    }
+    return dump_json(status)
+
+# ---- UPSTREAM STATUS TOOL ----
+@mcp.tool()
+@instrumented
+async def get_upstream_status() -> str:
+    """Get the circuit breaker state of each API host to see which backends are degraded."""
+    return dump_json({breaker.name: breaker.snapshot() for breaker in circuit_breakers.values()})
+
+# ---- SERVER METRICS TOOL ----
+@mcp.tool()
+@instrumented
+async def get_server_metrics(format: str = "json") -> str:
+    """Report per-tool and per-endpoint latency, payload sizes, cache hits and error classes.
+
+    format="openmetrics" returns Prometheus/OpenMetrics text instead of JSON.
+    """
+    if format == "openmetrics":
+        return metrics.openmetrics()
+    return dump_json(metrics.snapshot())
 
 # ---- RUN SERVER ----
+async def serve_network(transport: str, host: str, port: int) -> None:
+    """Serve MCP over streamable HTTP or SSE until SIGINT/SIGTERM, then drain in-flight requests."""
+    import uvicorn
+
+    mcp.client_concurrency = MCP_CLIENT_CONCURRENCY
+    mcp.settings.host, mcp.settings.port = host, port
+    if "*" in MCP_ALLOWED_HOSTS:
+        mcp.settings.transport_security = TransportSecuritySettings(enable_dns_rebinding_protection=False)
+    elif MCP_ALLOWED_HOSTS:
+        # FastMCP only allows localhost Host headers by default; a public bind has to accept the real host name
+        security = mcp.settings.transport_security or TransportSecuritySettings()
+        security.allowed_hosts = [*security.allowed_hosts, *MCP_ALLOWED_HOSTS]
+        security.allowed_origins = [
+            *security.allowed_origins,
+            *(f"{scheme}://{allowed}" for allowed in MCP_ALLOWED_HOSTS for scheme in ("http", "https"))
+        ]
+        mcp.settings.transport_security = security
+    if host not in ("127.0.0.1", "localhost", "::1"):
+        logger.warning("Serving MCP on %s:%d without authentication; anyone who can reach it can call the tools", host, port)
+    app = mcp.streamable_http_app() if transport == "streamable-http" else mcp.sse_app()
+    session_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def process_lifespan(app):
+        async with app_lifespan(mcp), session_lifespan(app):
+            yield
+
+    app.router.lifespan_context = process_lifespan
+    config = uvicorn.Config(
+        app, host=host, port=port,
+        log_level=mcp.settings.log_level.lower(),
+        limit_concurrency=MCP_MAX_CONNECTIONS or None,
+        timeout_graceful_shutdown=MCP_SHUTDOWN_TIMEOUT
+    )
+    await uvicorn.Server(config).serve()
+
+def run_server(transport: str = MCP_TRANSPORT, host: str = MCP_HOST, port: int = MCP_PORT) -> None:
+    if transport == "stdio":
+        mcp.run(transport="stdio")
+    elif transport in ("streamable-http", "sse"):
+        try:
+            asyncio.run(serve_network(transport, host, port))
+        except KeyboardInterrupt:
+            pass  # uvicorn has already drained and shut down; exit quietly
+    else:
+        raise ValueError(f"Unknown transport: {transport}")
+
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
+    parser = argparse.ArgumentParser(description="Social media analytics MCP server")
+    parser.add_argument("--transport", choices=("stdio", "streamable-http", "sse"), default=MCP_TRANSPORT)
+    parser.add_argument("--host", default=MCP_HOST)
+    parser.add_argument("--port", type=int, default=MCP_PORT)
+    args = parser.parse_args()
+    run_server(args.transport, args.host, args.port)